@@ -0,0 +1,49 @@
+import os
+
+
+TMP_SUFFIX = ".tmp"
+
+
+class AtomicWriter:
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.tmp_path = f"{path}{TMP_SUFFIX}"
+        self.sync = sync
+        self._file = open(self.tmp_path, "wb")
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def commit(self):
+        try:
+            if self.sync:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def write_atomic(path, data, sync=False):
+    with AtomicWriter(path, sync) as f:
+        f.write(data)
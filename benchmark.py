@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import imageio.v2 as imageio
+import dds
+import kernels
+import texture_engine
+from texture_engine import (MODES, ConversionJob, load_image, load_alpha,
+                            save_image, process_files, KIND_NORMAL, KIND_MASK)
+
+
+DEFAULT_SIZES = (512, 1024, 2048, 4096)
+STAGES = ("decode", "convert_bump_to_normal", "extract_channel", "encode")
+HEAVY_MODULES = ("numpy", "imageio", "PyQt6")
+STARTUP_TARGETS = {
+    "engine": "import texture_engine",
+    "gui": "import gui",
+    "first_image": "import texture_engine\ntexture_engine.load_image({path!r})",
+}
+
+
+def synthetic_texture(size, seed):
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    img = np.empty((size, size, 4), dtype=np.uint8)
+    for channel in range(4):
+        phase = rng.uniform(0, 2 * np.pi, 2)
+        freq = rng.uniform(2, 12, 2)
+        wave = np.sin(x * freq[0] * np.pi + phase[0]) * np.cos(y * freq[1] * np.pi + phase[1])
+        noise = rng.integers(-12, 13, (size, size))
+        img[:, :, channel] = np.clip(wave * 100 + 128 + noise, 0, 255).astype(np.uint8)
+    return img
+
+
+def write_texture(path, img):
+    if path.endswith(".dds"):
+        dds.write_dds(path, img, dds.FORMAT_BC3, mipmaps=False)
+    else:
+        imageio.imsave(path, img)
+
+
+def generate_textures(folder, sizes, ext, sets_per_size):
+    names = []
+    for size in sizes:
+        for index in range(sets_per_size):
+            stem = f"bench{size}_{index}"
+            for suffix, seed in (("_bump", 1), ("_bump#", 2), ("_colormap", 3)):
+                name = f"{stem}{suffix}.{ext}"
+                write_texture(os.path.join(folder, name), synthetic_texture(size, seed + index * 10 + size))
+                names.append(name)
+    return names
+
+
+def _folder_bytes(folder):
+    total = 0
+    for root, _, files in os.walk(folder):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def _peak_rss_mb():
+    peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak / 1024
+
+
+def bench_stages(source, ext, output_ext):
+    timings = {stage: 0.0 for stage in STAGES}
+    megabytes = {stage: 0.0 for stage in STAGES}
+    job = ConversionJob(source, file_extension=ext)
+    pool = kernels.BufferPool()
+    output_folder = tempfile.mkdtemp(prefix="bench_stage_")
+    try:
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            start = time.perf_counter()
+            img = load_alpha(path) if "bump#" in name else load_image(path)
+            timings["decode"] += time.perf_counter() - start
+            megabytes["decode"] += img.nbytes / 2 ** 20
+            if "bump#" in name or "colormap" in name:
+                continue
+            start = time.perf_counter()
+            normal = kernels.bump_to_normal(img, pool=pool)
+            timings["convert_bump_to_normal"] += time.perf_counter() - start
+            megabytes["convert_bump_to_normal"] += img.nbytes / 2 ** 20
+            start = time.perf_counter()
+            spec = kernels.red_to_spec(img, pool=pool)
+            timings["extract_channel"] += time.perf_counter() - start
+            megabytes["extract_channel"] += spec.nbytes / 2 ** 20
+            start = time.perf_counter()
+            save_image(job, os.path.join(output_folder, f"nmap{output_ext}"), normal, KIND_NORMAL)
+            save_image(job, os.path.join(output_folder, f"spec{output_ext}"), spec, KIND_MASK)
+            timings["encode"] += time.perf_counter() - start
+            megabytes["encode"] += (normal.nbytes + spec.nbytes) / 2 ** 20
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+    return {stage: {"seconds": round(timings[stage], 4),
+                    "mb_per_sec": round(megabytes[stage] / timings[stage], 2) if timings[stage] else None}
+            for stage in STAGES}
+
+
+def bench_mode(source, ext, mode, workers, global_format):
+    output_folder = tempfile.mkdtemp(prefix="bench_out_")
+    try:
+        job = ConversionJob(source, output_folder, file_extension=ext, mode=mode, global_format=global_format)
+        input_bytes = sum(os.path.getsize(os.path.join(source, name)) for name in texture_engine.list_files(job))
+        start = time.perf_counter()
+        results = list(process_files(job, workers))
+        elapsed = time.perf_counter() - start
+        failed = [result.error for result in results if not result.ok]
+        return {
+            "mode": mode,
+            "workers": workers,
+            "files": len(results),
+            "failed": len(failed),
+            "seconds": round(elapsed, 4),
+            "files_per_sec": round(len(results) / elapsed, 2) if elapsed else None,
+            "input_mb_per_sec": round(input_bytes / 2 ** 20 / elapsed, 2) if elapsed else None,
+            "input_mb": round(input_bytes / 2 ** 20, 2),
+            "output_mb": round(_folder_bytes(output_folder) / 2 ** 20, 2),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "errors": failed[:5],
+        }
+    finally:
+        shutil.rmtree(output_folder, ignore_errors=True)
+
+
+def _startup_probe(statement):
+    return (f"import sys, time\nstart = time.perf_counter()\n{statement}\n"
+            f"print(time.perf_counter() - start, *(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+
+
+def bench_startup(repeats=5):
+    folder = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        path = os.path.join(folder, "startup_bump.dds")
+        write_texture(path, synthetic_texture(256, 0))
+        results = {}
+        for name, statement in STARTUP_TARGETS.items():
+            probe = _startup_probe(statement.format(path=path))
+            runs = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                proc = subprocess.run([sys.executable, "-c", probe], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                      capture_output=True, text=True)
+                elapsed = time.perf_counter() - start
+                if proc.returncode:
+                    results[name] = {"error": (proc.stderr.strip().splitlines() or ["?"])[-1]}
+                    break
+                import_seconds, *modules = proc.stdout.split()
+                runs.append((elapsed, float(import_seconds)))
+            else:
+                results[name] = {
+                    "process_seconds": round(min(run[0] for run in runs), 4),
+                    "import_seconds": round(min(run[1] for run in runs), 4),
+                    "loaded": modules,
+                }
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _run_isolated(fn, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(fn, *args).result()
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, ext="dds", sets_per_size=2, workers=1, modes=MODES, global_format="png",
+                  startup_repeats=5):
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ext": ext,
+        "workers": workers,
+        "startup": bench_startup(startup_repeats) if startup_repeats else {},
+        "sizes": {},
+    }
+    for size in sizes:
+        source = tempfile.mkdtemp(prefix=f"bench_src_{size}_")
+        try:
+            generate_textures(source, [size], ext, sets_per_size)
+            output_ext = ".png" if ext == "dds" else ".dds"
+            entry = {"stages": _run_isolated(bench_stages, source, ext, output_ext), "modes": {}}
+            for mode in modes:
+                entry["modes"][mode] = _run_isolated(bench_mode, source, ext, mode, workers, global_format)
+            report["sizes"][str(size)] = entry
+        finally:
+            shutil.rmtree(source, ignore_errors=True)
+    return report
+
+
+def print_report(report, baseline=None):
+    print(f"Python {report['python']}, NumPy {report['numpy']}, {report['platform']}, ядер: {report['cpu_count']}")
+    if report.get("startup"):
+        print("\nЗапуск:")
+    for target, values in report.get("startup", {}).items():
+        if "error" in values:
+            print(f"  {target:<24} недоступно: {values['error']}")
+            continue
+        line = (f"  {target:<24} {values['process_seconds']:>9.3f} с  импорт {values['import_seconds']:.3f} с"
+                f"  [{', '.join(values['loaded']) or '-'}]")
+        old = (baseline or {}).get("startup", {}).get(target)
+        if old and old.get("process_seconds"):
+            line += f"  x{old['process_seconds'] / values['process_seconds']:.2f} к базовому"
+        print(line)
+    for size, entry in report["sizes"].items():
+        print(f"\n{size}x{size} ({report['ext']}):")
+        for stage, values in entry["stages"].items():
+            print(f"  {stage:<24} {values['seconds']:>9.3f} с  {values['mb_per_sec'] or 0:>9.1f} МБ/с")
+        for mode, values in entry["modes"].items():
+            line = (f"  {mode:<24} {values['files_per_sec'] or 0:>9.2f} файл/с {values['input_mb_per_sec'] or 0:>9.1f} МБ/с"
+                    f"  RSS {values['peak_rss_mb']:.0f} МБ")
+            old = (baseline or {}).get("sizes", {}).get(size, {}).get("modes", {}).get(mode)
+            if old and old.get("files_per_sec") and values["files_per_sec"]:
+                line += f"  x{values['files_per_sec'] / old['files_per_sec']:.2f} к базовому"
+            if values["failed"]:
+                line += f"  ошибок: {values['failed']}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер скорости конвертации на синтетических текстурах")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Размеры текстур")
+    parser.add_argument("-e", "--ext", choices=("dds", "png"), default="dds", help="Формат исходных текстур")
+    parser.add_argument("--sets", type=int, default=2, help="Наборов bump/bump#/colormap на каждый размер")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Число параллельных процессов")
+    parser.add_argument("-m", "--modes", choices=MODES, nargs="+", default=list(MODES), help="Режимы обработки")
+    parser.add_argument("--global-format", choices=("png", "dds"), default="png",
+                        help="Формат результатов глобальной обработки")
+    parser.add_argument("--startup-repeats", type=int, default=5,
+                        help="Повторов замера времени запуска (0 - не замерять)")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="Файл для сохранения результатов (JSON)")
+    parser.add_argument("--compare", help="JSON предыдущего замера для сравнения")
+    args = parser.parse_args(argv)
+    report = run_benchmark(args.sizes, args.ext, args.sets, args.jobs, args.modes, args.global_format,
+                           args.startup_repeats)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,549 @@
+import struct
+import numpy as np
+from kernels import to_uint8
+from mipmaps import HalfScaler, build_mip_chain, MIP_BOX, SPACE_LINEAR
+from atomic_file import AtomicWriter
+from formats import (FORMAT_BC1, FORMAT_BC2, FORMAT_BC3, FORMAT_BC4, FORMAT_BC5, FORMAT_BC7, FORMAT_RGBA,
+                     FORMAT_UNCOMPRESSED, FORMATS)
+
+
+DDS_MAGIC = b"DDS "
+
+DDSD_CAPS = 0x1
+DDSD_HEIGHT = 0x2
+DDSD_WIDTH = 0x4
+DDSD_PITCH = 0x8
+DDSD_PIXELFORMAT = 0x1000
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+DDSD_DEPTH = 0x800000
+
+DDPF_ALPHAPIXELS = 0x1
+DDPF_FOURCC = 0x4
+DDPF_ALPHA = 0x2
+DDPF_RGB = 0x40
+DDPF_LUMINANCE = 0x20000
+
+DDSCAPS_COMPLEX = 0x8
+DDSCAPS_TEXTURE = 0x1000
+DDSCAPS_MIPMAP = 0x400000
+DDSCAPS2_CUBEMAP = 0x200
+
+DXGI_FORMAT_BC7_UNORM = 98
+D3D10_RESOURCE_DIMENSION_TEXTURE2D = 3
+
+BLOCK_BYTES = {FORMAT_BC1: 8, FORMAT_BC2: 16, FORMAT_BC3: 16, FORMAT_BC4: 8, FORMAT_BC5: 16, FORMAT_BC7: 16}
+FOURCC = {FORMAT_BC1: b"DXT1", FORMAT_BC3: b"DXT5", FORMAT_BC4: b"ATI1", FORMAT_BC5: b"ATI2", FORMAT_BC7: b"DX10"}
+READ_FOURCC = {
+    b"DXT1": FORMAT_BC1, b"DXT2": FORMAT_BC2, b"DXT3": FORMAT_BC2, b"DXT4": FORMAT_BC3, b"DXT5": FORMAT_BC3,
+    b"ATI1": FORMAT_BC4, b"BC4U": FORMAT_BC4, b"ATI2": FORMAT_BC5, b"BC5U": FORMAT_BC5,
+}
+READ_DXGI = {71: FORMAT_BC1, 72: FORMAT_BC1, 74: FORMAT_BC2, 75: FORMAT_BC2, 77: FORMAT_BC3, 78: FORMAT_BC3,
+             80: FORMAT_BC4, 83: FORMAT_BC5, 98: FORMAT_BC7, 99: FORMAT_BC7}
+DECODABLE = (FORMAT_BC1, FORMAT_BC2, FORMAT_BC3, FORMAT_BC4, FORMAT_BC5, FORMAT_UNCOMPRESSED)
+
+BAND_BLOCK_ROWS = 64
+
+_BC7_WEIGHTS = np.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64], dtype=np.int32)
+_BC7_WEIGHT_LUT = np.abs(np.arange(65)[:, None] - _BC7_WEIGHTS[None, :]).argmin(axis=1).astype(np.uint64)
+_BC4_ORDER = np.array([1, 7, 6, 5, 4, 3, 2, 0], dtype=np.uint64)
+
+
+def to_rgba8(img):
+    img = to_uint8(img)
+    if img.ndim == 2:
+        img = img[:, :, None]
+    channels = img.shape[2]
+    if channels == 4:
+        return img
+    rgba = np.empty(img.shape[:2] + (4,), dtype=np.uint8)
+    if channels < 3:
+        rgba[:, :, :3] = img[:, :, :1]
+        rgba[:, :, 3] = img[:, :, 1] if channels == 2 else 255
+    else:
+        rgba[:, :, :3] = img[:, :, :3]
+        rgba[:, :, 3] = 255
+    return rgba
+
+
+def _blocks(img):
+    height, width = img.shape[:2]
+    pad_h, pad_w = -height % 4, -width % 4
+    if pad_h or pad_w:
+        img = np.pad(img, ((0, pad_h), (0, pad_w), (0, 0)), mode="edge")
+    rows, cols = img.shape[0] // 4, img.shape[1] // 4
+    return img.reshape(rows, 4, cols, 4, -1).swapaxes(1, 2).reshape(rows * cols, 16, -1)
+
+
+def _pack_565(rgb):
+    rgb = rgb.astype(np.uint32)
+    return ((rgb[:, 0] * 31 + 127) // 255 << 11) | ((rgb[:, 1] * 63 + 127) // 255 << 5) | ((rgb[:, 2] * 31 + 127) // 255)
+
+
+def _unpack_565(value):
+    value = value.astype(np.int32)
+    r = (value >> 11) & 31
+    g = (value >> 5) & 63
+    b = value & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+
+
+def _encode_color(blocks):
+    rgb = blocks[:, :, :3]
+    lo = rgb.min(axis=1)
+    hi = rgb.max(axis=1)
+    c0 = _pack_565(hi)
+    c1 = _pack_565(lo)
+    swap = c0 < c1
+    c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+    e0 = _unpack_565(c0)
+    e1 = _unpack_565(c1)
+    palette = np.stack([e0, e1, (2 * e0 + e1) // 3, (e0 + 2 * e1) // 3], axis=1)
+    diff = rgb.astype(np.int32)[:, :, None, :] - palette[:, None, :, :]
+    indices = np.einsum("bpkc,bpkc->bpk", diff, diff).argmin(axis=2).astype(np.uint32)
+    indices[c0 == c1] = 0
+    packed = np.bitwise_or.reduce(indices << (2 * np.arange(16, dtype=np.uint32)), axis=1)
+    out = np.empty(len(blocks), dtype=[("c0", "<u2"), ("c1", "<u2"), ("indices", "<u4")])
+    out["c0"] = c0
+    out["c1"] = c1
+    out["indices"] = packed
+    return out.view(np.uint8).reshape(len(blocks), 8)
+
+
+def _encode_channel(values):
+    a0 = values.max(axis=1).astype(np.int32)
+    a1 = values.min(axis=1).astype(np.int32)
+    span = np.maximum(a0 - a1, 1)
+    steps = ((values.astype(np.int32) - a1[:, None]) * 7 + span[:, None] // 2) // span[:, None]
+    indices = _BC4_ORDER[np.clip(steps, 0, 7)]
+    indices[a0 == a1] = 0
+    packed = np.bitwise_or.reduce(indices << (3 * np.arange(16, dtype=np.uint64)), axis=1)
+    out = np.empty((len(values), 8), dtype=np.uint8)
+    out[:, 0] = a0
+    out[:, 1] = a1
+    out[:, 2:] = packed.astype("<u8").view(np.uint8).reshape(-1, 8)[:, :6]
+    return out
+
+
+def _put_bits(lo, hi, value, offset):
+    value = value.astype(np.uint64)
+    if offset >= 64:
+        hi |= value << np.uint64(offset - 64)
+    else:
+        lo |= value << np.uint64(offset)
+
+
+def _bc7_endpoint(values):
+    best_q = best_p = best_err = None
+    for p in (0, 1):
+        q = np.clip((values.astype(np.int32) - p + 1) >> 1, 0, 127)
+        err = np.abs(((q << 1) | p) - values).sum(axis=1)
+        if best_err is None:
+            best_q, best_p, best_err = q, np.zeros(len(values), dtype=np.int32), err
+        else:
+            better = err < best_err
+            best_q = np.where(better[:, None], q, best_q)
+            best_p = np.where(better, p, best_p)
+    return best_q, best_p
+
+
+def _encode_bc7(blocks):
+    q0, p0 = _bc7_endpoint(blocks.min(axis=1).astype(np.int32))
+    q1, p1 = _bc7_endpoint(blocks.max(axis=1).astype(np.int32))
+    e0 = ((q0 << 1) | p0[:, None]).astype(np.float32)
+    e1 = ((q1 << 1) | p1[:, None]).astype(np.float32)
+    direction = e1 - e0
+    length = np.maximum((direction * direction).sum(axis=1), 1e-6)
+    t = ((blocks.astype(np.float32) - e0[:, None, :]) * direction[:, None, :]).sum(axis=2) / length[:, None]
+    indices = _BC7_WEIGHT_LUT[np.clip(np.rint(t * 64), 0, 64).astype(np.int64)]
+    flip = indices[:, 0] >= 8
+    indices[flip] = 15 - indices[flip]
+    q0, q1 = np.where(flip[:, None], q1, q0), np.where(flip[:, None], q0, q1)
+    p0, p1 = np.where(flip, p1, p0), np.where(flip, p0, p1)
+    lo = np.full(len(blocks), 1 << 6, dtype=np.uint64)
+    hi = np.zeros(len(blocks), dtype=np.uint64)
+    for channel in range(4):
+        _put_bits(lo, hi, q0[:, channel], 7 + channel * 14)
+        _put_bits(lo, hi, q1[:, channel], 14 + channel * 14)
+    _put_bits(lo, hi, p0, 63)
+    _put_bits(lo, hi, p1, 64)
+    _put_bits(lo, hi, indices[:, 0], 65)
+    for texel in range(1, 16):
+        _put_bits(lo, hi, indices[:, texel], 68 + (texel - 1) * 4)
+    return np.stack([lo, hi], axis=1).astype("<u8").view(np.uint8)
+
+
+def encode_blocks(img, fmt):
+    img = to_rgba8(img)
+    if fmt == FORMAT_RGBA:
+        return np.ascontiguousarray(img[:, :, [2, 1, 0, 3]]).tobytes()
+    bands = []
+    band_rows = BAND_BLOCK_ROWS * 4
+    for top in range(0, img.shape[0], band_rows):
+        blocks = _blocks(img[top:top + band_rows])
+        if fmt == FORMAT_BC1:
+            bands.append(_encode_color(blocks))
+        elif fmt == FORMAT_BC3:
+            bands.append(np.hstack([_encode_channel(blocks[:, :, 3]), _encode_color(blocks)]))
+        elif fmt == FORMAT_BC4:
+            bands.append(_encode_channel(blocks[:, :, 0]))
+        elif fmt == FORMAT_BC5:
+            bands.append(np.hstack([_encode_channel(blocks[:, :, 0]), _encode_channel(blocks[:, :, 1])]))
+        elif fmt == FORMAT_BC7:
+            bands.append(_encode_bc7(blocks))
+        else:
+            raise ValueError(f"Неподдерживаемый формат DDS: {fmt}")
+    return b"".join(band.tobytes() for band in bands)
+
+
+def _header(width, height, mip_count, fmt):
+    flags = DDSD_CAPS | DDSD_HEIGHT | DDSD_WIDTH | DDSD_PIXELFORMAT
+    caps = DDSCAPS_TEXTURE
+    if mip_count > 1:
+        flags |= DDSD_MIPMAPCOUNT
+        caps |= DDSCAPS_COMPLEX | DDSCAPS_MIPMAP
+    if fmt == FORMAT_RGBA:
+        flags |= DDSD_PITCH
+        pitch = width * 4
+        pixel_format = struct.pack("<II4sIIIII", 32, DDPF_RGB | DDPF_ALPHAPIXELS, b"\0\0\0\0", 32,
+                                   0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)
+    else:
+        flags |= DDSD_LINEARSIZE
+        pitch = max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * BLOCK_BYTES[fmt]
+        pixel_format = struct.pack("<II4sIIIII", 32, DDPF_FOURCC, FOURCC[fmt], 0, 0, 0, 0, 0)
+    header = struct.pack("<IIIIIII44x", 124, flags, height, width, pitch, 0, mip_count)
+    header += pixel_format + struct.pack("<IIII4x", caps, 0, 0, 0)
+    if fmt == FORMAT_BC7:
+        header += struct.pack("<IIIII", DXGI_FORMAT_BC7_UNORM, D3D10_RESOURCE_DIMENSION_TEXTURE2D, 0, 1, 0)
+    return DDS_MAGIC + header
+
+
+def mip_count(width, height):
+    return max(width, height).bit_length()
+
+
+class DDSBandWriter:
+    def __init__(self, path, width, height, fmt=FORMAT_BC3, mipmaps=True, mip_filter=MIP_BOX, space=SPACE_LINEAR,
+                 sync=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Неподдерживаемый формат DDS: {fmt}")
+        self.width = width
+        self.height = height
+        self.format = fmt
+        self.levels = mip_count(width, height) if mipmaps else 1
+        self.mip_filter = mip_filter
+        self.space = space
+        self.rows_written = 0
+        self._half = []
+        self._scaler = HalfScaler(width, height, mip_filter, space) if self.levels > 1 else None
+        self._file = AtomicWriter(path, sync)
+        self._file.write(_header(width, height, self.levels, fmt))
+
+    def write(self, band):
+        band = to_rgba8(band)
+        rows = band.shape[0]
+        if rows % 4 and self.rows_written + rows != self.height:
+            raise ValueError("Высота полосы DDS должна быть кратна 4")
+        self._file.write(encode_blocks(band, self.format))
+        self.rows_written += rows
+        if self._scaler is not None:
+            self._half.append(self._scaler.push(band))
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Записано строк {self.rows_written} из {self.height}")
+            if self._scaler is not None:
+                self._half.append(self._scaler.finish())
+                for level in build_mip_chain(np.concatenate(self._half), self.mip_filter, self.space):
+                    self._file.write(encode_blocks(level, self.format))
+                self._half = []
+        except BaseException:
+            self._file.discard()
+            raise
+        self._file.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.discard()
+
+
+def encode_dds(img, fmt=FORMAT_BC3, mipmaps=True, mip_filter=MIP_BOX, space=SPACE_LINEAR):
+    if fmt not in FORMATS:
+        raise ValueError(f"Неподдерживаемый формат DDS: {fmt}")
+    img = to_rgba8(img)
+    height, width = img.shape[:2]
+    levels = build_mip_chain(img, mip_filter, space) if mipmaps else [img]
+    return b"".join([_header(width, height, len(levels), fmt)] + [encode_blocks(level, fmt) for level in levels])
+
+
+def write_dds(path, img, fmt=FORMAT_BC3, mipmaps=True, mip_filter=MIP_BOX, space=SPACE_LINEAR):
+    height, width = img.shape[:2]
+    with DDSBandWriter(path, width, height, fmt, mipmaps, mip_filter, space) as writer:
+        writer.write(img)
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+class DDSInfo:
+    def __init__(self, width, height, mip_count, fmt, data_offset, bit_count=0, masks=(0, 0, 0, 0), flags=0):
+        self.width = width
+        self.height = height
+        self.mip_count = mip_count
+        self.format = fmt
+        self.data_offset = data_offset
+        self.bit_count = bit_count
+        self.masks = masks
+        self.flags = flags
+
+    @property
+    def channels(self):
+        if self.format == FORMAT_BC4:
+            return 1
+        if self.format == FORMAT_BC5:
+            return 3
+        if self.format != FORMAT_UNCOMPRESSED:
+            return 4
+        if self.flags & DDPF_RGB:
+            return 4 if self.flags & DDPF_ALPHAPIXELS else 3
+        return 2 if self.flags & DDPF_ALPHAPIXELS else 1
+
+    def level_size(self, level):
+        width, height = self.level_shape(level)
+        if self.format == FORMAT_UNCOMPRESSED:
+            return width * height * (self.bit_count // 8)
+        return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * BLOCK_BYTES[self.format]
+
+    def level_shape(self, level):
+        return max(1, self.width >> level), max(1, self.height >> level)
+
+    def level_offset(self, level):
+        return self.data_offset + sum(self.level_size(i) for i in range(level))
+
+
+def parse_header(data):
+    if len(data) < 128 or bytes(data[:4]) != DDS_MAGIC:
+        raise UnsupportedFormat("Файл не является DDS")
+    size, flags, height, width, _, depth, mip_count = struct.unpack_from("<7I", data, 4)
+    pf_flags, fourcc, bit_count = struct.unpack_from("<I4sI", data, 80)
+    masks = struct.unpack_from("<4I", data, 92)
+    caps2 = struct.unpack_from("<I", data, 112)[0]
+    if flags & DDSD_DEPTH and depth > 1 or caps2 & DDSCAPS2_CUBEMAP:
+        raise UnsupportedFormat("Объёмные и кубические DDS не поддерживаются")
+    data_offset = 128
+    if pf_flags & DDPF_FOURCC:
+        if fourcc == b"DX10":
+            dxgi_format = struct.unpack_from("<I", data, 128)[0]
+            data_offset += 20
+            if dxgi_format not in READ_DXGI:
+                raise UnsupportedFormat(f"Неподдерживаемый формат DXGI: {dxgi_format}")
+            fmt = READ_DXGI[dxgi_format]
+        elif fourcc in READ_FOURCC:
+            fmt = READ_FOURCC[fourcc]
+        else:
+            raise UnsupportedFormat(f"Неподдерживаемый FourCC: {fourcc!r}")
+    elif bit_count in (8, 16, 24, 32) and pf_flags & (DDPF_RGB | DDPF_LUMINANCE | DDPF_ALPHA):
+        fmt = FORMAT_UNCOMPRESSED
+    else:
+        raise UnsupportedFormat("Неподдерживаемый формат пикселей DDS")
+    return DDSInfo(width, height, max(1, mip_count), fmt, data_offset, bit_count, masks, pf_flags)
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        return parse_header(f.read(148))
+
+
+def _valid_pixel_bits():
+    bits = np.zeros((5, 5), dtype=np.uint32)
+    for rows in range(5):
+        for cols in range(5):
+            bits[rows, cols] = sum(1 << 2 * (y * 4 + x) for y in range(rows) for x in range(cols))
+    return bits
+
+
+_VALID_PIXEL_BITS = _valid_pixel_bits()
+
+
+def bc1_opaque(path, info=None):
+    info = info or read_header(path)
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    try:
+        block_cols, block_rows = max(1, (info.width + 3) // 4), max(1, (info.height + 3) // 4)
+        blocks = np.array(data[info.data_offset:info.data_offset + info.level_size(0)]).view("<u2").reshape(
+            block_rows, block_cols, 4)
+    finally:
+        del data
+    punch = blocks[:, :, 0] <= blocks[:, :, 1]
+    if not punch.any():
+        return True
+    bits = blocks[:, :, 2].astype(np.uint32) | (blocks[:, :, 3].astype(np.uint32) << 16)
+    rows = np.minimum(info.height - 4 * np.arange(block_rows), 4)
+    cols = np.minimum(info.width - 4 * np.arange(block_cols), 4)
+    transparent = bits & (bits >> 1) & _VALID_PIXEL_BITS[rows[:, None], cols[None, :]]
+    return not (punch & (transparent != 0)).any()
+
+
+def _lookup(palette, indices):
+    rows = np.arange(0, palette.size, palette.shape[1], dtype=np.intp)
+    return palette.reshape(-1)[indices.astype(np.intp) + rows[:, None]]
+
+
+def _decode_color(blocks, punch_through):
+    c0 = blocks[:, 0:2].copy().view("<u2")[:, 0]
+    c1 = blocks[:, 2:4].copy().view("<u2")[:, 0]
+    e0 = _unpack_565(c0)
+    e1 = _unpack_565(c1)
+    four = (c0 > c1) | (not punch_through)
+    palette = np.empty((len(blocks), 4, 4), dtype=np.uint8)
+    palette[:, 0, :3] = e0
+    palette[:, 1, :3] = e1
+    palette[:, 2, :3] = np.where(four[:, None], (2 * e0 + e1) // 3, (e0 + e1) // 2)
+    palette[:, 3, :3] = np.where(four[:, None], (e0 + 2 * e1) // 3, 0)
+    palette[:, :, 3] = 255
+    palette[:, 3, 3] = np.where(four, 255, 0)
+    bits = blocks[:, 4:8].copy().view("<u4")[:, 0]
+    indices = (bits[:, None] >> (2 * np.arange(16, dtype=np.uint32))) & 3
+    return _lookup(palette.view("<u4")[:, :, 0], indices).view(np.uint8).reshape(len(blocks), 16, 4)
+
+
+def _decode_channel(blocks):
+    a0 = blocks[:, 0].astype(np.int32)
+    a1 = blocks[:, 1].astype(np.int32)
+    eight = a0 > a1
+    steps = np.arange(1, 7, dtype=np.int32)
+    palette = np.empty((len(blocks), 8), dtype=np.uint8)
+    palette[:, 0] = a0
+    palette[:, 1] = a1
+    palette[:, 2:8] = ((7 - steps) * a0[:, None] + steps * a1[:, None]) // 7
+    five = ~eight
+    if five.any():
+        steps5 = np.arange(1, 5, dtype=np.int32)
+        palette[five, 2:6] = ((5 - steps5) * a0[five, None] + steps5 * a1[five, None]) // 5
+        palette[five, 6] = 0
+        palette[five, 7] = 255
+    raw = np.zeros((len(blocks), 8), dtype=np.uint8)
+    raw[:, :6] = blocks[:, 2:8]
+    lo = raw[:, 0:4].copy().view("<u4")[:, 0]
+    hi = raw[:, 3:7].copy().view("<u4")[:, 0]
+    shifts = 3 * np.arange(8, dtype=np.uint32)
+    indices = np.concatenate([(lo[:, None] >> shifts) & 7, (hi[:, None] >> shifts) & 7], axis=1)
+    return _lookup(palette, indices)
+
+
+def _decode_explicit_alpha(blocks):
+    bits = blocks[:, :8].copy().view("<u8")[:, 0]
+    values = (bits[:, None] >> (4 * np.arange(16, dtype=np.uint64))) & np.uint64(15)
+    return (values * 17).astype(np.uint8)
+
+
+def _decode_blocks(blocks, fmt, channels):
+    count = len(blocks)
+    wanted = set(channels)
+    out = np.zeros((count, 16, len(channels)), dtype=np.uint8)
+    if fmt in (FORMAT_BC1, FORMAT_BC2, FORMAT_BC3):
+        color = None
+        if wanted & {0, 1, 2} or (fmt == FORMAT_BC1 and 3 in wanted):
+            color = _decode_color(blocks[:, -8:], fmt == FORMAT_BC1)
+        alpha = None
+        if 3 in wanted and fmt == FORMAT_BC2:
+            alpha = _decode_explicit_alpha(blocks)
+        elif 3 in wanted and fmt == FORMAT_BC3:
+            alpha = _decode_channel(blocks[:, :8])
+        for i, channel in enumerate(channels):
+            out[:, :, i] = color[:, :, 3] if channel == 3 and alpha is None else alpha if channel == 3 else color[:, :, channel]
+    elif fmt == FORMAT_BC4:
+        decoded = _decode_channel(blocks)
+        for i, channel in enumerate(channels):
+            out[:, :, i] = decoded
+    elif fmt == FORMAT_BC5:
+        for i, channel in enumerate(channels):
+            if channel < 2:
+                out[:, :, i] = _decode_channel(blocks[:, channel * 8:channel * 8 + 8])
+    else:
+        raise UnsupportedFormat(f"Декодирование {fmt} не поддерживается")
+    return out
+
+
+def _mask_shift(mask):
+    shift = 0
+    while mask and not mask & 1:
+        mask >>= 1
+        shift += 1
+    return shift, mask
+
+
+def _decode_uncompressed(raw, info, width, height, channels):
+    pixel_bytes = info.bit_count // 8
+    raw = np.asarray(raw).reshape(height, width, pixel_bytes)
+    if pixel_bytes == 3:
+        values = raw[:, :, 0].astype(np.uint32) | raw[:, :, 1].astype(np.uint32) << 8 | raw[:, :, 2].astype(np.uint32) << 16
+    else:
+        values = np.ascontiguousarray(raw).view(f"<u{pixel_bytes}")[:, :, 0].astype(np.uint32)
+    limit = (1 << info.bit_count) - 1
+    masks = [mask & limit for mask in info.masks]
+    if not info.flags & DDPF_RGB:
+        luminance = masks[0] or (0xFF if info.flags & DDPF_LUMINANCE else 0)
+        alpha = masks[3] or (limit & ~luminance if info.flags & DDPF_ALPHAPIXELS else 0)
+        masks = [luminance, 0, 0, alpha]
+    out = np.empty((height, width, len(channels)), dtype=np.uint8)
+    for i, channel in enumerate(channels):
+        mask = masks[0] if not info.flags & DDPF_RGB and channel < 3 else masks[channel]
+        if not mask:
+            out[:, :, i] = 255 if channel == 3 else 0
+            continue
+        shift, bits = _mask_shift(mask)
+        out[:, :, i] = ((values >> shift) & bits) * 255 // bits
+    return out
+
+
+def _decode_level(data, info, offset, width, top, bottom, channels):
+    block_bytes = BLOCK_BYTES[info.format]
+    cols = max(1, (width + 3) // 4)
+    row_bytes = cols * block_bytes
+    first, last = top // 4, (bottom + 3) // 4
+    out = np.empty(((last - first) * 4, cols * 4, len(channels)), dtype=np.uint8)
+    for band in range(first, last, BAND_BLOCK_ROWS):
+        band_end = min(band + BAND_BLOCK_ROWS, last)
+        raw = np.asarray(data[offset + band * row_bytes:offset + band_end * row_bytes]).reshape(-1, block_bytes)
+        decoded = _decode_blocks(raw, info.format, channels)
+        target = out[(band - first) * 4:(band_end - first) * 4]
+        target.reshape(band_end - band, 4, cols, 4, len(channels))[:] = \
+            decoded.reshape(band_end - band, cols, 4, 4, len(channels)).swapaxes(1, 2)
+    return out[top - first * 4:bottom - first * 4, :width]
+
+
+def read_dds(path, mip=0, channels=None, rows=None):
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    try:
+        info = parse_header(data[:148])
+        if info.format not in DECODABLE:
+            raise UnsupportedFormat(f"Декодирование {info.format} не поддерживается")
+        mip = min(mip, info.mip_count - 1)
+        squeeze = isinstance(channels, int) or channels is None and info.channels == 1
+        if channels is None:
+            channels = [0, 3] if info.channels == 2 else list(range(info.channels))
+        elif squeeze:
+            channels = [channels]
+        width, height = info.level_shape(mip)
+        top, bottom = rows if rows is not None else (0, height)
+        offset = info.level_offset(mip)
+        if info.format == FORMAT_UNCOMPRESSED:
+            pitch = width * (info.bit_count // 8)
+            raw = data[offset + top * pitch:offset + bottom * pitch]
+            img = _decode_uncompressed(raw, info, width, bottom - top, channels)
+        else:
+            img = _decode_level(data, info, offset, width, top, bottom, channels)
+        img = np.ascontiguousarray(img[:, :, 0] if squeeze else img)
+    finally:
+        del data
+    return img
@@ -0,0 +1,23 @@
+FORMAT_BC1 = "bc1"
+FORMAT_BC3 = "bc3"
+FORMAT_BC4 = "bc4"
+FORMAT_BC5 = "bc5"
+FORMAT_BC7 = "bc7"
+FORMAT_RGBA = "rgba"
+FORMATS = (FORMAT_BC1, FORMAT_BC3, FORMAT_BC4, FORMAT_BC5, FORMAT_BC7, FORMAT_RGBA)
+FORMAT_BC2 = "bc2"
+FORMAT_UNCOMPRESSED = "uncompressed"
+
+MIP_BOX = "box"
+MIP_KAISER = "kaiser"
+MIP_FILTERS = (MIP_BOX, MIP_KAISER)
+SPACE_LINEAR = "linear"
+SPACE_SRGB = "srgb"
+SPACE_NORMAL = "normal"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_FAST = "fast"
+PNG_BALANCED = "balanced"
+PNG_ARCHIVE = "archive"
+PNG_PROFILES = (PNG_FAST, PNG_BALANCED, PNG_ARCHIVE)
+COMPRESS_LEVELS = {PNG_FAST: 1, PNG_BALANCED: 6, PNG_ARCHIVE: 9}
@@ -0,0 +1,966 @@
+import os
+import sys
+import threading
+from collections import deque
+from texture_engine import (MODE_GLOBAL, MODE_CONVERT, MODE_ALPHA, ConversionJob, scan_job,
+                            process_files, default_workers, DDS_FORMATS, PNG_PROFILES, PNG_BALANCED,
+                            NORMAL_MODES, NORMAL_SWIZZLE, NORMAL_HEIGHT, MIP_FILTERS)
+from thumbnails import ThumbnailCache, VARIANT_SOURCE, VARIANT_NORMAL
+from profiling import RunReport, REPORT_NAME, format_summary
+from planner import CostModel, find_benchmark, plan_job, format_plan, format_plan_files
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QLabel, QPushButton, QFileDialog, QListWidget, QLineEdit,
+                             QMessageBox, QProgressBar, QCheckBox, QGroupBox, QRadioButton,
+                             QFrame, QTabWidget, QSpinBox, QDoubleSpinBox, QComboBox)
+from PyQt6.QtCore import (Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QUrl, QSize, QObject, QThread,
+                          pyqtSignal, QTimer, QPoint)
+from PyQt6.QtGui import QColor, QPalette, QFont, QIcon, QPixmap, QDesktopServices
+
+
+class StalkerStyle:
+    @staticmethod
+    def get_dark_palette():
+        palette = QPalette()
+        palette.setColor(QPalette.ColorRole.Window, QColor(30, 30, 30))
+        palette.setColor(QPalette.ColorRole.WindowText, QColor(200, 200, 200))
+        palette.setColor(QPalette.ColorRole.Base, QColor(40, 40, 40))
+        palette.setColor(QPalette.ColorRole.AlternateBase, QColor(50, 50, 50))
+        palette.setColor(QPalette.ColorRole.ToolTipBase, QColor(60, 60, 60))
+        palette.setColor(QPalette.ColorRole.ToolTipText, QColor(200, 200, 200))
+        palette.setColor(QPalette.ColorRole.Text, QColor(200, 200, 200))
+        palette.setColor(QPalette.ColorRole.Button, QColor(70, 70, 70))
+        palette.setColor(QPalette.ColorRole.ButtonText, QColor(200, 200, 200))
+        palette.setColor(QPalette.ColorRole.BrightText, Qt.GlobalColor.white)
+        palette.setColor(QPalette.ColorRole.Highlight, QColor(100, 120, 50))
+        palette.setColor(QPalette.ColorRole.HighlightedText, Qt.GlobalColor.white)
+        return palette
+
+    @staticmethod
+    def get_stylesheet():
+        return """
+            QMainWindow {
+                background-color: #1e1e1e;
+                border: 1px solid #3a3a3a;
+            }
+            QTabWidget::pane {
+                border: 1px solid #3a3a3a;
+                border-radius: 2px;
+                margin-top: 5px;
+                background: #262626;
+            }
+            QTabBar::tab {
+                background: #262626;
+                color: #c8c8c8;
+                padding: 8px;
+                border: 1px solid #3a3a3a;
+                border-bottom: none;
+                border-top-left-radius: 3px;
+                border-top-right-radius: 3px;
+                min-width: 100px;
+            }
+            QTabBar::tab:selected {
+                background: #323232;
+                color: #e0e0e0;
+                border-color: #646464;
+            }
+            QTabBar::tab:hover {
+                background: #323232;
+            }
+            QGroupBox {
+                color: #a0a0a0;
+                font-weight: bold;
+                border: 1px solid #3a3a3a;
+                border-radius: 3px;
+                margin-top: 10px;
+                padding-top: 15px;
+                background: #262626;
+            }
+            QLabel {
+                color: #c8c8c8;
+            }
+            QLineEdit {
+                background-color: #2a2a2a;
+                color: #c8c8c8;
+                border: 1px solid #3a3a3a;
+                border-radius: 2px;
+                padding: 5px;
+                selection-background-color: #646464;
+            }
+            QSpinBox, QDoubleSpinBox, QComboBox {
+                background-color: #2a2a2a;
+                color: #c8c8c8;
+                border: 1px solid #3a3a3a;
+                border-radius: 2px;
+                padding: 3px;
+            }
+            QListWidget {
+                background-color: #2a2a2a;
+                color: #c8c8c8;
+                border: 1px solid #3a3a3a;
+                border-radius: 2px;
+                selection-background-color: #646464;
+            }
+            QProgressBar {
+                border: 1px solid #3a3a3a;
+                border-radius: 2px;
+                text-align: center;
+                color: #c8c8c8;
+                background: #2a2a2a;
+            }
+            QProgressBar::chunk {
+                background-color: #647833;
+            }
+            QCheckBox, QRadioButton {
+                color: #c8c8c8;
+                spacing: 5px;
+            }
+            QCheckBox::indicator, QRadioButton::indicator {
+                width: 16px;
+                height: 16px;
+                border: 1px solid #3a3a3a;
+                background: #2a2a2a;
+            }
+            QCheckBox::indicator:checked, QRadioButton::indicator:checked {
+                background: #647833;
+                border: 1px solid #7a8c43;
+            }
+            QPushButton {
+                background-color: #3a3a3a;
+                color: #c8c8c8;
+                border: 1px solid #4a4a4a;
+                border-radius: 2px;
+                padding: 5px 10px;
+                min-width: 80px;
+            }
+            QPushButton:hover {
+                background-color: #4a4a4a;
+                border-color: #5a5a5a;
+            }
+            QPushButton:pressed {
+                background-color: #2a2a2a;
+            }
+            QPushButton:disabled {
+                background-color: #2a2a2a;
+                color: #6a6a6a;
+            }
+            #githubButton {
+                border: none;
+                background: transparent;
+            }
+            #githubButton:hover {
+                background: rgba(255, 255, 255, 0.1);
+            }
+        """
+
+
+class AnimatedButton(QPushButton):
+    def __init__(self, text, parent=None):
+        super().__init__(text, parent)
+        self._color = QColor("#3a3a3a")
+        self._default_color = QColor("#3a3a3a")
+        self._hover_color = QColor("#4a4a4a")
+        self._pressed_color = QColor("#2a2a2a")
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self._update_style()
+        self._animation = QPropertyAnimation(self, b"color")
+        self._animation.setDuration(200)
+        self._animation.setEasingCurve(QEasingCurve.Type.OutQuad)
+    
+    def _update_style(self):
+        self.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {self._color.name()};
+                color: #c8c8c8;
+                border: 1px solid #4a4a4a;
+                border-radius: 2px;
+                padding: 5px 10px;
+                min-width: 80px;
+            }}
+            QPushButton:hover {{
+                background-color: {self._hover_color.name()};
+                border-color: #5a5a5a;
+            }}
+            QPushButton:pressed {{
+                background-color: {self._pressed_color.name()};
+            }}
+        """)
+    
+    @pyqtProperty(QColor)
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        self._color = value
+        self._update_style()
+
+    def enterEvent(self, event):
+        self._animate_color(self._hover_color)
+        super().enterEvent(event)
+
+    def leaveEvent(self, event):
+        self._animate_color(self._default_color)
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        self._animate_color(self._pressed_color, 100)
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._animate_color(self._hover_color if self.underMouse() else self._default_color)
+        super().mouseReleaseEvent(event)
+
+    def _animate_color(self, target_color, duration=200):
+        self._animation.stop()
+        self._animation.setDuration(duration)
+        self._animation.setEndValue(target_color)
+        self._animation.start()
+
+
+class ScanWorker(QObject):
+    files_found = pyqtSignal(list)
+    finished = pyqtSignal(int)
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        found = 0
+        for chunk in scan_job(self.job):
+            if self._cancelled:
+                break
+            found += len(chunk)
+            self.files_found.emit(chunk)
+        self.finished.emit(found)
+
+
+class PlanWorker(QObject):
+    finished = pyqtSignal(object)
+
+    def __init__(self, job, workers=1):
+        super().__init__()
+        self.job = job
+        self.workers = workers
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        benchmark_path = find_benchmark()
+        model = CostModel.load(benchmark_path) if benchmark_path else None
+        self.finished.emit(plan_job(self.job, self.job.files, model, self.workers, lambda: self._cancelled))
+
+
+class ThumbnailLoader(QObject):
+    thumbnail_ready = pyqtSignal(str, str, int, object, bytes)
+
+    def __init__(self, sizes=(48, 256)):
+        super().__init__()
+        self._caches = {}
+        self._sizes = sizes
+        self._requests = deque()
+        self._pending = set()
+        self._condition = threading.Condition()
+        self._running = True
+
+    def request(self, path, variant=VARIANT_SOURCE, size=48, normal_options=(NORMAL_SWIZZLE, 1.0)):
+        key = (path, variant, size, normal_options)
+        with self._condition:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            self._requests.append(key)
+            self._condition.notify()
+
+    def clear(self):
+        with self._condition:
+            self._requests.clear()
+            self._pending.clear()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def _cache(self, size):
+        if size not in self._caches:
+            self._caches[size] = ThumbnailCache(size=size)
+        return self._caches[size]
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._requests:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                key = self._requests.pop()
+            path, variant, size, normal_options = key
+            try:
+                data = self._cache(size).get(path, variant, *normal_options)
+            except Exception:
+                data = b""
+            with self._condition:
+                self._pending.discard(key)
+            if data:
+                self.thumbnail_ready.emit(path, variant, size, normal_options, data)
+
+
+class ConversionWorker(QObject):
+    progress = pyqtSignal(int)
+    total_changed = pyqtSignal(int)
+    file_failed = pyqtSignal(str, str)
+    finished = pyqtSignal(int, int, list, bool, object, object)
+
+    def __init__(self, job, workers=1, profile=False):
+        super().__init__()
+        self.job = job
+        self.workers = workers
+        self.profile = profile
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _scan(self):
+        total = 0
+        for chunk in scan_job(self.job):
+            if self._cancelled:
+                return
+            total += len(chunk)
+            self.total_changed.emit(total)
+            yield from chunk
+
+    def run(self):
+        processed = skipped = 0
+        errors = []
+        failure = None
+        report = RunReport(profile=self.profile)
+        self.job.profile_dir = report.profile_dir
+        files = self.job.files if self.job.files is not None else self._scan()
+        try:
+            results = process_files(self.job, self.workers, files)
+            try:
+                for result in results:
+                    report.add(result)
+                    processed += 1
+                    if not result.ok:
+                        errors.append((result.file_name, result.error))
+                        self.file_failed.emit(result.file_name, result.error)
+                    elif result.skipped:
+                        skipped += 1
+                    self.progress.emit(processed)
+                    if self._cancelled:
+                        break
+            finally:
+                results.close()
+        except Exception as e:
+            failure = str(e) or type(e).__name__
+        try:
+            summary = report.write(os.path.join(self.job.output_folder, REPORT_NAME))
+        except OSError:
+            summary = report.summary()
+        self.finished.emit(processed, skipped, errors, self._cancelled, summary, failure)
+
+
+class FileProcessingTab(QWidget):
+    DDS_FORMAT_NAMES = {"auto": "Авто (BC1/BC3/BC4)", "rgba": "Без сжатия"}
+    PNG_PROFILE_NAMES = {"fast": "Быстро", "balanced": "Сбалансированно", "archive": "Максимальное"}
+    NORMAL_MODE_NAMES = {"swizzle": "Перестановка каналов", "renormalize": "Восстановить Z",
+                         "height": "Из карты высот"}
+    MIP_FILTER_NAMES = {"box": "Box", "kaiser": "Kaiser"}
+
+    def __init__(self, file_extension, parent=None):
+        super().__init__(parent)
+        self.file_extension = file_extension
+        self._thread = None
+        self._worker = None
+        self._scan_thread = None
+        self._scan_worker = None
+        self._plan_thread = None
+        self._plan_worker = None
+        self._items = {}
+        self._setup_ui()
+        self._setup_thumbnails()
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+        self.mode_group = QGroupBox("Режим работы:")
+        mode_layout = QHBoxLayout()
+        self.mode_convert = QRadioButton("Конвертация bump в normal")
+        self.mode_alpha = QRadioButton("Извлечение roughness")
+        self.mode_global = QRadioButton("Глобальная обработка")
+        self.mode_global.setChecked(True)
+        mode_layout.addWidget(self.mode_convert)
+        mode_layout.addWidget(self.mode_alpha)
+        mode_layout.addWidget(self.mode_global)
+        self.mode_group.setLayout(mode_layout)
+        layout.addWidget(self.mode_group)
+        self._setup_folder_controls(layout)
+        self.file_list_label = QLabel(f"Найденные файлы (.{self.file_extension}):")
+        self.file_list = QListWidget()
+        self.file_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.file_list.setIconSize(QSize(48, 48))
+        self.file_list.setUniformItemSizes(True)
+        layout.addWidget(self.file_list_label)
+        list_layout = QHBoxLayout()
+        list_layout.addWidget(self.file_list, 1)
+        list_layout.addLayout(self._setup_preview())
+        layout.addLayout(list_layout)
+        self._setup_options(layout)
+        self._setup_buttons(layout)
+        self.mode_convert.toggled.connect(self._toggle_mode)
+        self.mode_alpha.toggled.connect(self._toggle_mode)
+        self.mode_global.toggled.connect(self._toggle_mode)
+    
+    def _setup_preview(self):
+        preview_layout = QVBoxLayout()
+        self.preview_source = QLabel("Исходник")
+        self.preview_result = QLabel("Normal map")
+        for label in (self.preview_source, self.preview_result):
+            label.setFixedSize(192, 192)
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setStyleSheet("border: 1px solid #3a3a3a; background: #2a2a2a;")
+            preview_layout.addWidget(label)
+        preview_layout.addStretch()
+        return preview_layout
+
+    def _setup_thumbnails(self):
+        self._thumbnail_thread = QThread(self)
+        self._thumbnail_loader = ThumbnailLoader()
+        self._thumbnail_loader.moveToThread(self._thumbnail_thread)
+        self._thumbnail_thread.started.connect(self._thumbnail_loader.run)
+        self._thumbnail_loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self._thumbnail_thread.start()
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(100)
+        self._visible_timer.timeout.connect(self._request_visible_thumbnails)
+        self.file_list.verticalScrollBar().valueChanged.connect(self._visible_timer.start)
+        self.file_list.currentItemChanged.connect(self._request_preview)
+
+    def _full_path(self, name):
+        return os.path.join(self.source_path.text(), name)
+
+    def _add_found_files(self, names):
+        start = self.file_list.count()
+        self.file_list.addItems(names)
+        for row, name in enumerate(names, start):
+            self._items[self._full_path(name)] = self.file_list.item(row)
+        self._visible_timer.start()
+
+    def _clear_file_list(self):
+        self._thumbnail_loader.clear()
+        self._items = {}
+        self.file_list.clear()
+        self.preview_source.clear()
+        self.preview_result.clear()
+
+    def _request_visible_thumbnails(self):
+        count = self.file_list.count()
+        if not count:
+            return
+        viewport = self.file_list.viewport()
+        first = self.file_list.indexAt(QPoint(0, 0)).row()
+        last = self.file_list.indexAt(QPoint(0, viewport.height() - 1)).row()
+        first = max(first, 0)
+        last = count - 1 if last < 0 else last
+        for row in range(last, first - 1, -1):
+            item = self.file_list.item(row)
+            if item.icon().isNull():
+                self._thumbnail_loader.request(self._full_path(item.text()))
+
+    def _request_preview(self, current, previous=None):
+        self.preview_source.clear()
+        self.preview_result.clear()
+        if current is None:
+            return
+        path = self._full_path(current.text())
+        name = current.text().lower()
+        if "bump" in name and "bump#" not in name:
+            self._thumbnail_loader.request(path, VARIANT_NORMAL, 256, self._normal_options())
+        self._thumbnail_loader.request(path, VARIANT_SOURCE, 256)
+
+    def _normal_options(self):
+        mode = self.normal_mode.currentData()
+        return mode, self.normal_strength.value() if mode == NORMAL_HEIGHT else 1.0
+
+    def _on_thumbnail_ready(self, path, variant, size, normal_options, data):
+        pixmap = QPixmap()
+        if not pixmap.loadFromData(data):
+            return
+        if size != 256:
+            item = self._items.get(path)
+            if item is not None:
+                item.setIcon(QIcon(pixmap))
+            return
+        current = self.file_list.currentItem()
+        if current is None or self._full_path(current.text()) != path:
+            return
+        if variant == VARIANT_NORMAL and normal_options != self._normal_options():
+            return
+        label = self.preview_result if variant == VARIANT_NORMAL else self.preview_source
+        label.setPixmap(pixmap.scaled(label.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                                      Qt.TransformationMode.SmoothTransformation))
+
+    def _setup_folder_controls(self, layout):
+        source_layout = QHBoxLayout()
+        self.source_label = QLabel("Исходная папка:")
+        self.source_path = QLineEdit()
+        self.source_path.setReadOnly(True)
+        self.browse_source = AnimatedButton("Обзор...")
+        self.browse_source.clicked.connect(self._select_source_folder)
+        source_layout.addWidget(self.source_label)
+        source_layout.addWidget(self.source_path)
+        source_layout.addWidget(self.browse_source)
+        self.recursive = QCheckBox("Включая подпапки")
+        self.recursive.toggled.connect(self._refresh_file_list)
+        source_layout.addWidget(self.recursive)
+        layout.addLayout(source_layout)
+        output_layout = QHBoxLayout()
+        self.output_label = QLabel("Папка назначения:")
+        self.output_path = QLineEdit()
+        self.output_path.setReadOnly(True)
+        self.browse_output = AnimatedButton("Обзор...")
+        self.browse_output.clicked.connect(self._select_output_folder)
+        output_layout.addWidget(self.output_label)
+        output_layout.addWidget(self.output_path)
+        output_layout.addWidget(self.browse_output)
+        layout.addLayout(output_layout)
+    
+    def _setup_options(self, layout):
+        self.convert_options = QGroupBox("Настройки конвертации:")
+        convert_layout = QVBoxLayout()
+        self.process_bump = QCheckBox(f"Обрабатывать только *_bump.{self.file_extension}")
+        self.process_bump.setChecked(True)
+        self.create_spec = QCheckBox("Создавать specular карты")
+        self.create_spec.setChecked(True)
+        self.convert_to_png = QCheckBox("Конвертировать в PNG" if self.file_extension == "dds" else "Конвертировать в DDS")
+        convert_layout.addWidget(self.process_bump)
+        convert_layout.addWidget(self.create_spec)
+        convert_layout.addWidget(self.convert_to_png)
+        self.convert_options.setLayout(convert_layout)
+        self.convert_options.setVisible(False)
+        layout.addWidget(self.convert_options)
+        self.alpha_options = QGroupBox("Настройки roughness:")
+        alpha_layout = QVBoxLayout()
+        self.process_alpha = QCheckBox(f"Обрабатывать *bump#.{self.file_extension}")
+        self.process_alpha.setChecked(True)
+        self.delete_original = QCheckBox("Удалять исходные файлы")
+        self.alpha_convert_to_png = QCheckBox("Конвертировать в PNG" if self.file_extension == "dds" else "Конвертировать в DDS")
+        alpha_layout.addWidget(self.process_alpha)
+        alpha_layout.addWidget(self.delete_original)
+        alpha_layout.addWidget(self.alpha_convert_to_png)
+        self.alpha_options.setLayout(alpha_layout)
+        self.alpha_options.setVisible(False)
+        layout.addWidget(self.alpha_options)
+        self.global_options = QGroupBox("Глобальные настройки:")
+        global_layout = QVBoxLayout()
+        self.convert_colormap = QCheckBox(f"Конвертировать *_colormap.{self.file_extension}")
+        self.convert_colormap.setChecked(True)
+        self.convert_bump = QCheckBox(f"Конвертировать *_bump.{self.file_extension}")
+        self.convert_bump.setChecked(True)
+        self.extract_roughness = QCheckBox(f"Извлекать roughness из *bump#.{self.file_extension}")
+        self.extract_roughness.setChecked(True)
+        self.keep_originals = QCheckBox("Сохранять оригиналы")
+        self.keep_originals.setChecked(True)
+        self.global_to_dds = QCheckBox("Сохранять результаты в DDS")
+        global_layout.addWidget(self.convert_colormap)
+        global_layout.addWidget(self.convert_bump)
+        global_layout.addWidget(self.extract_roughness)
+        global_layout.addWidget(self.keep_originals)
+        global_layout.addWidget(self.global_to_dds)
+        self.global_options.setLayout(global_layout)
+        layout.addWidget(self.global_options)
+        dds_layout = QHBoxLayout()
+        self.dds_format_label = QLabel("Сжатие DDS:")
+        self.dds_format = QComboBox()
+        for fmt in DDS_FORMATS:
+            self.dds_format.addItem(self.DDS_FORMAT_NAMES.get(fmt, fmt.upper()), fmt)
+        self.dds_mipmaps = QCheckBox("Мип-уровни")
+        self.dds_mipmaps.setChecked(True)
+        self.mip_filter = QComboBox()
+        for mip_filter in MIP_FILTERS:
+            self.mip_filter.addItem(self.MIP_FILTER_NAMES.get(mip_filter, mip_filter), mip_filter)
+        self.mip_filter.setToolTip("Фильтр уменьшения мип-уровней: box - быстрый, kaiser - более резкий")
+        self.dds_mipmaps.toggled.connect(self.mip_filter.setEnabled)
+        dds_layout.addWidget(self.dds_format_label)
+        dds_layout.addWidget(self.dds_format)
+        dds_layout.addWidget(self.dds_mipmaps)
+        dds_layout.addWidget(self.mip_filter)
+        self.png_profile_label = QLabel("Сжатие PNG:")
+        self.png_profile = QComboBox()
+        for profile in PNG_PROFILES:
+            self.png_profile.addItem(self.PNG_PROFILE_NAMES.get(profile, profile), profile)
+        self.png_profile.setCurrentIndex(PNG_PROFILES.index(PNG_BALANCED))
+        self.png_profile.setToolTip("Быстро - для черновых сборок, максимальное - для релиза")
+        dds_layout.addWidget(self.png_profile_label)
+        dds_layout.addWidget(self.png_profile)
+        self.masks_8bit = QCheckBox("8-битные маски")
+        self.masks_8bit.setToolTip("Сохранять roughness и spec в PNG как 8-битные оттенки серого, даже из 16-битных исходников")
+        dds_layout.addWidget(self.masks_8bit)
+        dds_layout.addStretch()
+        layout.addLayout(dds_layout)
+        normal_layout = QHBoxLayout()
+        self.normal_mode_label = QLabel("Нормали:")
+        self.normal_mode = QComboBox()
+        for mode in NORMAL_MODES:
+            self.normal_mode.addItem(self.NORMAL_MODE_NAMES.get(mode, mode), mode)
+        self.normal_mode.setToolTip("Восстановить Z - пересчитать Z из X/Y и нормализовать, "
+                                    "из карты высот - градиенты Собеля")
+        self.normal_strength_label = QLabel("Сила:")
+        self.normal_strength = QDoubleSpinBox()
+        self.normal_strength.setRange(0.1, 50.0)
+        self.normal_strength.setSingleStep(0.5)
+        self.normal_strength.setValue(1.0)
+        self.normal_mode.currentIndexChanged.connect(self._toggle_normal_strength)
+        self.normal_mode.currentIndexChanged.connect(self._refresh_normal_preview)
+        self.normal_strength.valueChanged.connect(self._refresh_normal_preview)
+        normal_layout.addWidget(self.normal_mode_label)
+        normal_layout.addWidget(self.normal_mode)
+        normal_layout.addWidget(self.normal_strength_label)
+        normal_layout.addWidget(self.normal_strength)
+        normal_layout.addStretch()
+        layout.addLayout(normal_layout)
+        self._toggle_normal_strength()
+
+    def _refresh_normal_preview(self):
+        current = self.file_list.currentItem()
+        name = current.text().lower() if current is not None else ""
+        if "bump" in name and "bump#" not in name:
+            self.preview_result.clear()
+            self._thumbnail_loader.request(self._full_path(current.text()), VARIANT_NORMAL, 256, self._normal_options())
+
+    def _toggle_normal_strength(self):
+        enabled = self.normal_mode.currentData() == NORMAL_HEIGHT
+        self.normal_strength_label.setEnabled(enabled)
+        self.normal_strength.setEnabled(enabled)
+    
+    def _setup_buttons(self, layout):
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        self.progress.setTextVisible(False)
+        layout.addWidget(self.progress)
+        button_layout = QHBoxLayout()
+        self.workers_label = QLabel("Процессов:")
+        self.workers = QSpinBox()
+        self.workers.setRange(1, default_workers())
+        self.workers.setValue(default_workers())
+        self.workers.setToolTip("Число параллельных процессов конвертации")
+        button_layout.addWidget(self.workers_label)
+        button_layout.addWidget(self.workers)
+        self.incremental = QCheckBox("Пропускать неизменённые")
+        self.incremental.setToolTip("Не обрабатывать файлы, которые не изменились с прошлого запуска")
+        button_layout.addWidget(self.incremental)
+        self.resume = QCheckBox("Продолжать прерванный запуск")
+        self.resume.setChecked(True)
+        self.resume.setToolTip("Пропускать файлы, уже обработанные запуском, который был прерван или завершился с ошибками")
+        button_layout.addWidget(self.resume)
+        self.tiled = QCheckBox("Обработка полосами")
+        self.tiled.setToolTip("Читать и записывать DDS полосами строк, чтобы большие текстуры не занимали память целиком")
+        button_layout.addWidget(self.tiled)
+        self.profile = QCheckBox("Профилирование")
+        self.profile.setToolTip("Собрать профиль cProfile вместе с отчётом о времени этапов")
+        button_layout.addWidget(self.profile)
+        button_layout.addStretch()
+        self.refresh_button = AnimatedButton("Обновить список")
+        self.refresh_button.clicked.connect(self._refresh_file_list)
+        self.plan_button = AnimatedButton("План")
+        self.plan_button.setToolTip("Пробный запуск: какие файлы будут записаны, перезаписаны и удалены, "
+                                    "и сколько это займёт")
+        self.plan_button.clicked.connect(self._plan_files)
+        self.convert_button = AnimatedButton("Конвертировать")
+        self.convert_button.clicked.connect(self._process_files)
+        self.cancel_button = AnimatedButton("Отмена")
+        self.cancel_button.clicked.connect(self._cancel_processing)
+        self.cancel_button.setVisible(False)
+        button_layout.addWidget(self.refresh_button)
+        button_layout.addWidget(self.plan_button)
+        button_layout.addWidget(self.convert_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+    
+    def _toggle_mode(self):
+        self.convert_options.setVisible(self.mode_convert.isChecked())
+        self.alpha_options.setVisible(self.mode_alpha.isChecked())
+        self.global_options.setVisible(self.mode_global.isChecked())
+        self._refresh_file_list()
+    
+    def _select_source_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите исходную папку")
+        if folder:
+            self.source_path.setText(folder)
+            self._refresh_file_list()
+    
+    def _select_output_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Выберите папку назначения")
+        if folder:
+            self.output_path.setText(folder)
+    
+    def _current_mode(self):
+        if self.mode_global.isChecked():
+            return MODE_GLOBAL
+        if self.mode_convert.isChecked():
+            return MODE_CONVERT
+        return MODE_ALPHA
+
+    def _build_job(self, files=None):
+        mode = self._current_mode()
+        if mode == MODE_GLOBAL:
+            pattern_only, change_format, delete_originals = True, True, not self.keep_originals.isChecked()
+        elif mode == MODE_CONVERT:
+            pattern_only, change_format, delete_originals = self.process_bump.isChecked(), self.convert_to_png.isChecked(), False
+        else:
+            pattern_only, change_format, delete_originals = self.process_alpha.isChecked(), self.alpha_convert_to_png.isChecked(), self.delete_original.isChecked()
+        return ConversionJob(
+            self.source_path.text(), self.output_path.text(), file_extension=self.file_extension, mode=mode,
+            files=files, pattern_only=pattern_only, change_format=change_format, delete_originals=delete_originals,
+            convert_colormap=self.convert_colormap.isChecked(), convert_bump=self.convert_bump.isChecked(),
+            extract_roughness=self.extract_roughness.isChecked(), create_spec=self.create_spec.isChecked(),
+            incremental=self.incremental.isChecked(), recursive=self.recursive.isChecked(),
+            resume=self.resume.isChecked(), global_format="dds" if self.global_to_dds.isChecked() else "png",
+            dds_format=self.dds_format.currentData(), dds_mipmaps=self.dds_mipmaps.isChecked(),
+            mip_filter=self.mip_filter.currentData(),
+            tiled=self.tiled.isChecked(), png_profile=self.png_profile.currentData(),
+            masks_8bit=self.masks_8bit.isChecked(), normal_mode=self.normal_mode.currentData(), normal_strength=self.normal_strength.value())
+
+    def _refresh_file_list(self):
+        self._stop_scan()
+        self._clear_file_list()
+        self._scan_thread = QThread(self)
+        self._scan_worker = ScanWorker(self._build_job())
+        self._scan_worker.moveToThread(self._scan_thread)
+        self._scan_thread.started.connect(self._scan_worker.run)
+        self._scan_worker.files_found.connect(self._add_found_files)
+        self._scan_worker.finished.connect(self._on_scan_finished)
+        self._scan_worker.finished.connect(self._scan_thread.quit)
+        self._scan_thread.finished.connect(self._scan_worker.deleteLater)
+        self._scan_thread.start()
+
+    def _stop_scan(self):
+        if self._scan_worker is not None:
+            try:
+                self._scan_worker.files_found.disconnect(self._add_found_files)
+                self._scan_worker.cancel()
+            except (RuntimeError, TypeError):
+                pass
+            self._scan_thread.quit()
+            self._scan_thread.wait()
+            self._scan_worker = None
+            self._scan_thread = None
+
+    def _on_scan_finished(self, found):
+        if self.sender() is self._scan_worker:
+            self._scan_worker = None
+            self._scan_thread = None
+    
+    def _plan_files(self):
+        source_folder = self.source_path.text()
+        if not source_folder or not os.path.exists(source_folder):
+            QMessageBox.warning(self, "Ошибка", "Укажите корректную исходную папку")
+            return
+        if self._plan_worker is not None:
+            return
+        selected_items = self.file_list.selectedItems()
+        job = self._build_job([item.text() for item in selected_items] if selected_items else None)
+        self.plan_button.setEnabled(False)
+        self._plan_thread = QThread(self)
+        self._plan_worker = PlanWorker(job, self.workers.value())
+        self._plan_worker.moveToThread(self._plan_thread)
+        self._plan_thread.started.connect(self._plan_worker.run)
+        self._plan_worker.finished.connect(self._on_plan_finished)
+        self._plan_worker.finished.connect(self._plan_thread.quit)
+        self._plan_thread.finished.connect(self._plan_worker.deleteLater)
+        self._plan_thread.start()
+
+    def _stop_plan(self):
+        if self._plan_worker is not None:
+            try:
+                self._plan_worker.finished.disconnect(self._on_plan_finished)
+                self._plan_worker.cancel()
+            except (RuntimeError, TypeError):
+                pass
+            self._plan_thread.quit()
+            self._plan_thread.wait()
+            self._plan_worker = None
+            self._plan_thread = None
+
+    def _on_plan_finished(self, plan):
+        self._plan_worker = None
+        self._plan_thread = None
+        self.plan_button.setEnabled(True)
+        box = QMessageBox(QMessageBox.Icon.Information, "План обработки", format_plan(plan), parent=self)
+        box.setDetailedText(format_plan_files(plan))
+        box.exec()
+
+    def _process_files(self):
+        source_folder = self.source_path.text()
+        if not source_folder or not os.path.exists(source_folder):
+            QMessageBox.warning(self, "Ошибка", "Укажите корректную исходную папку")
+            return
+        selected_items = self.file_list.selectedItems()
+        files_to_process = [item.text() for item in selected_items] if selected_items else None
+        job = self._build_job(files_to_process)
+        if self.mode_global.isChecked() and not files_to_process:
+            reply = QMessageBox.question(self, "Подтверждение", 
+                                       "Обработать все файлы в папке?",
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.No:
+                return
+        elif not files_to_process:
+            QMessageBox.warning(self, "Ошибка", "Выберите файлы для обработки")
+            return
+        self.progress.setVisible(True)
+        self.progress.setMaximum(len(job.files) if job.files is not None else 0)
+        self.progress.setValue(0)
+        self._set_running(True)
+        self._thread = QThread(self)
+        self._worker = ConversionWorker(job, self.workers.value(), self.profile.isChecked())
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.progress.connect(self.progress.setValue)
+        self._worker.total_changed.connect(self.progress.setMaximum)
+        self._worker.finished.connect(self._on_processing_finished)
+        self._worker.finished.connect(self._thread.quit)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self._thread.start()
+
+    def _set_running(self, running):
+        self.convert_button.setEnabled(not running)
+        self.refresh_button.setEnabled(not running)
+        self.mode_group.setEnabled(not running)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(running)
+
+    def _cancel_processing(self):
+        if self._worker is not None:
+            self.cancel_button.setEnabled(False)
+            self._worker.cancel()
+
+    def stop(self):
+        self._stop_scan()
+        self._stop_plan()
+        self._cancel_processing()
+        if self._thread is not None:
+            self._thread.quit()
+            self._thread.wait()
+        self._thumbnail_loader.stop()
+        self._thumbnail_thread.quit()
+        self._thumbnail_thread.wait()
+
+    def _on_processing_finished(self, processed, skipped, errors, cancelled, summary, failure):
+        self._worker = None
+        self._thread = None
+        self.progress.setVisible(False)
+        self._set_running(False)
+        if failure is not None:
+            QMessageBox.warning(self, "Ошибка", f"Обработка остановлена: {failure}\nОбработано файлов: {processed}")
+            return
+        if cancelled:
+            text = f"Обработка прервана. Обработано файлов: {processed}"
+        else:
+            text = "Обработка завершена!"
+        if skipped:
+            text += f"\nБез изменений пропущено: {skipped}"
+        details = format_summary(summary)
+        if errors:
+            box = QMessageBox(QMessageBox.Icon.Warning, "Готово с ошибками",
+                              f"{text}\nОшибок: {len(errors)} из {processed}", parent=self)
+            details = "\n".join(f"{name}: {error}" for name, error in errors) + f"\n\n{details}"
+        else:
+            box = QMessageBox(QMessageBox.Icon.Information, "Готово", text, parent=self)
+        box.setDetailedText(details)
+        box.exec()
+
+
+class StalkerConverterApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("S.T.A.L.K.E.R. Texture Converter")
+        self.setGeometry(100, 100, 900, 700)
+        if os.path.exists("stalker_icon.png"):
+            self.setWindowIcon(QIcon("stalker_icon.png"))
+        self._setup_ui()
+        self._setup_style()
+        self.show()
+    
+    def _setup_ui(self):
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        layout = QVBoxLayout(main_widget)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        header = QHBoxLayout()
+        
+        if os.path.exists("stalker_logo.png"):
+            logo = QLabel()
+            logo.setPixmap(QPixmap("stalker_logo.png").scaled(100, 100, Qt.AspectRatioMode.KeepAspectRatio))
+            header.addWidget(logo)
+        else:
+            header.addStretch()
+        
+        title = QLabel("S.T.A.L.K.E.R. TEXTURE CONVERTER")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        title.setStyleSheet("color: #647833; margin-bottom: 10px;")
+        header.addWidget(title)
+        
+        if not os.path.exists("stalker_logo.png"):
+            header.addStretch()
+
+        self.github_btn = QPushButton()
+        if os.path.exists("github_icon.png"):
+            icon = QIcon("github_icon.png")
+            self.github_btn.setIcon(icon)
+            self.github_btn.setIconSize(QSize(32, 32))
+        else:
+            self.github_btn.setText("GitHub")
+        self.github_btn.setObjectName("githubButton")
+        self.github_btn.setToolTip("Открыть репозиторий на GitHub")
+        self.github_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.github_btn.clicked.connect(lambda: QDesktopServices.openUrl(QUrl("https://github.com/Endenss/TextureConverterPro-TCP")))
+        header.addWidget(self.github_btn)
+        
+        layout.addLayout(header)
+
+        separator = QFrame()
+        separator.setFrameShape(QFrame.Shape.HLine)
+        separator.setFrameShadow(QFrame.Shadow.Sunken)
+        separator.setStyleSheet("color: #3a3a3a;")
+        layout.addWidget(separator)
+
+        self.tabs = QTabWidget()
+        self.dds_tab = FileProcessingTab("dds")
+        self.tabs.addTab(self.dds_tab, "DDS Processing")
+        self.png_tab = FileProcessingTab("png")
+        self.tabs.addTab(self.png_tab, "PNG Processing")
+        layout.addWidget(self.tabs)
+    
+    def closeEvent(self, event):
+        for tab in (self.dds_tab, self.png_tab):
+            tab.stop()
+        super().closeEvent(event)
+
+    def _setup_style(self):
+        QApplication.instance().setPalette(StalkerStyle.get_dark_palette())
+        self.setStyleSheet(StalkerStyle.get_stylesheet())
+
+
+def main(argv=None):
+    app = QApplication(sys.argv if argv is None else argv)
+    app.setStyle("Fusion")
+    window = StalkerConverterApp()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
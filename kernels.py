@@ -0,0 +1,195 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+POOL_MAX_BYTES = 512 * 1024 * 1024
+
+
+class BufferPool:
+    def __init__(self, max_bytes=POOL_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._buffers = OrderedDict()
+        self._bytes = 0
+
+    def get(self, shape, dtype=np.uint8, tag=None):
+        key = (tuple(shape), np.dtype(dtype).str, tag)
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self._buffers.move_to_end(key)
+            return buffer
+        buffer = np.empty(shape, dtype=dtype)
+        self._buffers[key] = buffer
+        self._bytes += buffer.nbytes
+        while self._bytes > self.max_bytes and len(self._buffers) > 1:
+            _, evicted = self._buffers.popitem(last=False)
+            self._bytes -= evicted.nbytes
+        return buffer
+
+    def clear(self):
+        self._buffers.clear()
+        self._bytes = 0
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+_local = threading.local()
+
+
+def worker_pool():
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = BufferPool()
+    return pool
+
+
+def _output(pool, shape, dtype, tag):
+    if pool is None:
+        return np.empty(shape, dtype=dtype)
+    return pool.get(shape, dtype, tag)
+
+
+def _full_scale(dtype):
+    return np.iinfo(dtype).max if np.issubdtype(dtype, np.integer) else 1.0
+
+
+def _zero_level(dtype):
+    return (np.iinfo(dtype).max + 1) // 2 if np.issubdtype(dtype, np.integer) else 0.5
+
+
+def bump_to_normal(img, out=None, pool=None):
+    channels = img.shape[2]
+    if channels not in (3, 4):
+        raise ValueError(f"Ожидается RGB или RGBA изображение, получено каналов: {channels}")
+    if out is None:
+        out = _output(pool, img.shape, img.dtype, "normal")
+    if channels == 4 and img.dtype == np.uint8 and img.flags.c_contiguous and out.flags.c_contiguous:
+        words = out.view("<u4")
+        np.copyto(words, img.view("<u4"))
+        words.byteswap(inplace=True)
+        words |= np.uint32(0xFF000000)
+    elif channels == 4:
+        out[:, :, 0] = img[:, :, 3]
+        out[:, :, 1] = img[:, :, 2]
+        out[:, :, 2] = img[:, :, 1]
+        out[:, :, 3] = _full_scale(out.dtype)
+    else:
+        out[:, :, 0] = _zero_level(out.dtype)
+        out[:, :, 1] = img[:, :, 2]
+        out[:, :, 2] = img[:, :, 1]
+    return out
+
+
+def _float_buffer(pool, shape, tag):
+    return _output(pool, shape, np.float32, tag)
+
+
+def _store_normals(x, y, z, out):
+    full = _full_scale(out.dtype)
+    for channel, component in enumerate((x, y, z)):
+        component *= np.float32(full / 2)
+        component += np.float32(_zero_level(out.dtype))
+        np.copyto(out[:, :, channel], component, casting="unsafe")
+    if out.shape[2] == 4:
+        out[:, :, 3] = full
+    return out
+
+
+def _normalize(x, y, z, length):
+    np.multiply(x, x, out=length)
+    length += y * y
+    length += z * z
+    np.sqrt(length, out=length)
+    np.maximum(length, 1e-6, out=length)
+    x /= length
+    y /= length
+    z /= length
+
+
+def reconstruct_normal(img, out=None, pool=None):
+    out = bump_to_normal(img, out, pool)
+    shape = out.shape[:2]
+    x = _float_buffer(pool, shape, "normal_x")
+    y = _float_buffer(pool, shape, "normal_y")
+    z = _float_buffer(pool, shape, "normal_z")
+    scale = np.float32(2 / _full_scale(out.dtype))
+    np.multiply(out[:, :, 0], scale, out=x)
+    np.multiply(out[:, :, 1], scale, out=y)
+    x -= 1
+    y -= 1
+    np.multiply(x, x, out=z)
+    z += y * y
+    np.maximum(z, 1, out=z)
+    np.sqrt(z, out=z)
+    x /= z
+    y /= z
+    np.multiply(x, x, out=z)
+    z += y * y
+    np.subtract(1, z, out=z)
+    np.maximum(z, 0, out=z)
+    np.sqrt(z, out=z)
+    return _store_normals(x, y, z, out)
+
+
+def height_to_normal(img, strength=1.0, out=None, pool=None):
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    if out is None:
+        out = _output(pool, img.shape[:2] + (4 if channels == 4 else 3,), img.dtype, "normal")
+    height, width = img.shape[:2]
+    padded = _float_buffer(pool, (height + 2, width + 2), "height")
+    if channels == 1:
+        np.copyto(padded[1:-1, 1:-1], img if img.ndim == 2 else img[:, :, 0])
+    else:
+        np.copyto(padded[1:-1, 1:-1], img[:, :, 0])
+        padded[1:-1, 1:-1] += img[:, :, 1]
+        padded[1:-1, 1:-1] += img[:, :, 2]
+        padded[1:-1, 1:-1] /= 3
+    padded[1:-1, 1:-1] *= np.float32(strength / _full_scale(img.dtype))
+    padded[0, 1:-1] = padded[1, 1:-1]
+    padded[-1, 1:-1] = padded[-2, 1:-1]
+    padded[:, 0] = padded[:, 1]
+    padded[:, -1] = padded[:, -2]
+    x = _float_buffer(pool, (height, width), "normal_x")
+    y = _float_buffer(pool, (height, width), "normal_y")
+    z = _float_buffer(pool, (height, width), "normal_z")
+    diff = _float_buffer(pool, (height + 2, width), "sobel_x")
+    np.subtract(padded[:, :-2], padded[:, 2:], out=diff)
+    np.add(diff[:-2], diff[2:], out=x)
+    x += diff[1:-1]
+    x += diff[1:-1]
+    diff = _float_buffer(pool, (height, width + 2), "sobel_y")
+    np.subtract(padded[:-2], padded[2:], out=diff)
+    np.add(diff[:, :-2], diff[:, 2:], out=y)
+    y += diff[:, 1:-1]
+    y += diff[:, 1:-1]
+    z.fill(1)
+    _normalize(x, y, z, _float_buffer(pool, (height, width), "normal_length"))
+    return _store_normals(x, y, z, out)
+
+
+def to_uint8(img):
+    img = np.asarray(img)
+    if img.dtype == np.uint8:
+        return img
+    if np.issubdtype(img.dtype, np.floating):
+        return np.clip(img * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    return (img >> (8 * (img.dtype.itemsize - 1))).astype(np.uint8)
+
+
+def extract_channel(img, channel, out=None, pool=None, tag="channel"):
+    if out is None:
+        out = _output(pool, img.shape[:2], img.dtype, tag)
+    np.copyto(out, img[:, :, channel])
+    return out
+
+
+def alpha_to_roughness(img, out=None, pool=None):
+    if img.ndim == 2:
+        return img
+    return extract_channel(img, 3 if img.shape[2] >= 4 else 0, out, pool, "roughness")
+
+
+def red_to_spec(img, out=None, pool=None):
+    return extract_channel(img, 0, out, pool, "spec")
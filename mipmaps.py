@@ -0,0 +1,142 @@
+import numpy as np
+import kernels
+from formats import MIP_BOX, MIP_KAISER, SPACE_LINEAR, SPACE_SRGB, SPACE_NORMAL
+
+
+KAISER_TAPS = 8
+KAISER_BETA = 4.0
+
+
+def _filter_weights(mip_filter):
+    if mip_filter == MIP_BOX:
+        return np.array([0.5, 0.5], dtype=np.float32)
+    if mip_filter == MIP_KAISER:
+        offsets = np.arange(KAISER_TAPS) - (KAISER_TAPS - 1) / 2
+        weights = np.sinc(offsets / 2) * np.kaiser(KAISER_TAPS, KAISER_BETA)
+        return (weights / weights.sum()).astype(np.float32)
+    raise ValueError(f"Неизвестный фильтр мип-уровней: {mip_filter}")
+
+
+def _srgb_to_linear_table():
+    values = np.arange(256, dtype=np.float64) / 255
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4).astype(np.float32)
+
+
+SRGB_TO_LINEAR = _srgb_to_linear_table()
+
+
+def _to_float(band, space, pool):
+    out = pool.get(band.shape, np.float32, "mip_float")
+    if space == SPACE_SRGB:
+        out[:, :, :3] = SRGB_TO_LINEAR[band[:, :, :3]]
+    elif space == SPACE_NORMAL:
+        np.multiply(band[:, :, :3], np.float32(2 / 255), out=out[:, :, :3])
+        out[:, :, :3] -= 1
+    else:
+        np.copyto(out, band)
+        return out
+    np.copyto(out[:, :, 3:], band[:, :, 3:])
+    return out
+
+
+def _to_uint8(img, space):
+    rgb = img[:, :, :3]
+    if space == SPACE_SRGB:
+        np.clip(rgb, 0, 1, out=rgb)
+        curve = np.power(rgb, np.float32(1 / 2.4))
+        curve *= 1.055
+        curve -= 0.055
+        rgb[...] = np.where(rgb <= 0.0031308, rgb * 12.92, curve) * 255
+    elif space == SPACE_NORMAL:
+        length = np.sqrt(np.einsum("ijk,ijk->ij", rgb, rgb))
+        flat = length < 1e-6
+        length[flat] = 1
+        rgb /= length[:, :, None]
+        rgb[flat] = (0, 0, 1)
+        rgb += 1
+        rgb *= 127.5
+    img += 0.5
+    np.clip(img, 0, 255, out=img)
+    return img.astype(np.uint8)
+
+
+def _decimate(src, weights, axis, count, pool):
+    shape = list(src.shape)
+    shape[axis] = count
+    out = np.empty(shape, dtype=np.float32)
+    index = [slice(None)] * src.ndim
+    taps = []
+    for tap in range(len(weights)):
+        index[axis] = slice(tap, tap + 2 * count - 1, 2)
+        taps.append(src[tuple(index)])
+    if len(weights) == 2:
+        np.add(taps[0], taps[1], out=out)
+        out *= weights[0]
+        return out
+    scratch = pool.get(shape, np.float32, "mip_scratch")
+    np.multiply(taps[0], weights[0], out=out)
+    for tap, weight in zip(taps[1:], weights[1:]):
+        np.multiply(tap, weight, out=scratch)
+        out += scratch
+    return out
+
+
+class HalfScaler:
+    def __init__(self, width, height, mip_filter=MIP_BOX, space=SPACE_LINEAR):
+        self.width = width
+        self.height = height
+        self.out_width = max(1, width // 2)
+        self.out_height = max(1, height // 2)
+        self.space = space
+        self.rows_out = 0
+        self._weights = _filter_weights(mip_filter)
+        self._pending = None
+
+    def _horizontal(self, band, pool):
+        img = _to_float(band, self.space, pool)
+        if self.width == 1:
+            return img.copy()
+        taps = len(self._weights)
+        if taps > 2:
+            img = np.pad(img, ((0, 0), (taps // 2 - 1, taps // 2), (0, 0)), mode="edge")
+        return _decimate(img, self._weights, 1, self.out_width, pool)
+
+    def _emit(self, rows, final, pool):
+        if self.height == 1:
+            return _to_uint8(rows, self.space)
+        taps = len(self._weights)
+        if self._pending is None:
+            self._pending = np.repeat(rows[:1], taps // 2 - 1, axis=0)
+        pending = np.concatenate([self._pending, rows]) if len(self._pending) else rows
+        if final:
+            pending = np.concatenate([pending] + [pending[-1:]] * (taps // 2))
+        count = min(self.out_height - self.rows_out, max(0, (len(pending) - taps) // 2 + 1))
+        self._pending = pending[2 * count:]
+        self.rows_out += count
+        if not count:
+            return np.empty((0, self.out_width, rows.shape[2]), dtype=np.uint8)
+        out = _decimate(pending[:2 * count + taps - 2], self._weights, 0, count, pool)
+        return _to_uint8(out, self.space)
+
+    def push(self, band):
+        pool = kernels.worker_pool()
+        return self._emit(self._horizontal(band, pool), False, pool)
+
+    def finish(self):
+        pool = kernels.worker_pool()
+        if self._pending is None:
+            return np.empty((0, self.out_width, 4), dtype=np.uint8)
+        return self._emit(self._pending[:0], True, pool)
+
+
+def downsample(img, mip_filter=MIP_BOX, space=SPACE_LINEAR):
+    scaler = HalfScaler(img.shape[1], img.shape[0], mip_filter, space)
+    return np.concatenate([scaler.push(img), scaler.finish()])
+
+
+def build_mip_chain(img, mip_filter=MIP_BOX, space=SPACE_LINEAR):
+    levels = [img]
+    while img.shape[0] > 1 or img.shape[1] > 1:
+        img = downsample(img, mip_filter, space)
+        levels.append(img)
+    return levels
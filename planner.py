@@ -0,0 +1,207 @@
+import os
+import json
+import math
+import struct
+from formats import PNG_SIGNATURE
+from texture_engine import Manifest, RunJournal, iter_files, plan_file, MODE_CONVERT
+
+
+BENCHMARK_NAME = "benchmark.json"
+MAX_LISTED_FILES = 2000
+
+
+def read_dimensions(path):
+    if path.lower().endswith(".dds"):
+        import dds
+        try:
+            info = dds.read_header(path)
+            return info.width, info.height
+        except dds.UnsupportedFormat:
+            return None
+    with open(path, "rb") as f:
+        head = f.read(24)
+    if head[:8] == PNG_SIGNATURE and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    return None
+
+
+def find_benchmark():
+    for folder in (os.getcwd(), os.path.dirname(os.path.abspath(__file__))):
+        path = os.path.join(folder, BENCHMARK_NAME)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class CostModel:
+    def __init__(self, modes, source=None):
+        self.modes = modes
+        self.source = source
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            return None
+        modes = {}
+        for size, entry in report.get("sizes", {}).items():
+            pixels = int(size) ** 2
+            for mode, values in entry.get("modes", {}).items():
+                files = values.get("files", 0) - values.get("failed", 0)
+                if files <= 0 or not values.get("seconds"):
+                    continue
+                total = files * pixels
+                modes.setdefault(mode, []).append((
+                    pixels,
+                    values["seconds"] * values.get("workers", 1) / total,
+                    values.get("output_mb", 0) * 2 ** 20 / total,
+                ))
+        return cls(modes, path) if modes else None
+
+    def estimate(self, mode, pixels):
+        samples = self.modes.get(mode)
+        if not samples or not pixels:
+            return None
+        _, seconds, nbytes = min(samples, key=lambda sample: abs(math.log(sample[0] / pixels)))
+        return pixels * seconds, pixels * nbytes
+
+
+class PlannedFile:
+    def __init__(self, file_name, outputs=(), size=None, skipped=False, deletes=False, overwrites=(), error=None):
+        self.file_name = file_name
+        self.outputs = list(outputs)
+        self.size = size
+        self.skipped = skipped
+        self.deletes = deletes
+        self.overwrites = list(overwrites)
+        self.error = error
+        self.seconds = None
+        self.output_bytes = None
+
+    @property
+    def pixels(self):
+        return self.size[0] * self.size[1] if self.size else 0
+
+    @property
+    def active(self):
+        return bool(self.outputs) and not self.skipped and not self.error
+
+
+def plan_input(job, file_name, manifest=None, journal=None):
+    input_path = os.path.join(job.source_folder, file_name)
+    outputs = [output_path for output_path, _, _ in plan_file(job, file_name)]
+    if not outputs:
+        return PlannedFile(file_name)
+    if journal is not None and journal.completed_entry(job, file_name) is not None:
+        return PlannedFile(file_name, outputs, skipped=True)
+    if manifest is not None and manifest.current_entry(job, file_name, verify_hash=False) is not None:
+        return PlannedFile(file_name, outputs, skipped=True)
+    try:
+        size = read_dimensions(input_path)
+    except (OSError, ValueError) as e:
+        return PlannedFile(file_name, outputs, error=str(e))
+    return PlannedFile(file_name, outputs, size, deletes=job.delete_originals and job.mode != MODE_CONVERT,
+                       overwrites=[path for path in outputs if os.path.exists(path)])
+
+
+class JobPlan:
+    def __init__(self, job, model=None, workers=1):
+        self.job = job
+        self.model = model
+        self.workers = max(1, workers)
+        self.files = []
+        self.seconds = 0.0
+        self.output_bytes = 0
+        self.estimated = 0
+
+    def add(self, planned):
+        if planned.active and self.model is not None:
+            estimate = self.model.estimate(self.job.mode, planned.pixels)
+            if estimate is not None:
+                planned.seconds, planned.output_bytes = estimate
+                self.seconds += planned.seconds
+                self.output_bytes += planned.output_bytes
+                self.estimated += 1
+        self.files.append(planned)
+
+    def wall_seconds(self):
+        active = sum(1 for planned in self.files if planned.active)
+        return self.seconds / max(1, min(self.workers, active))
+
+    def summary(self):
+        active = [planned for planned in self.files if planned.active]
+        return {
+            "mode": self.job.mode,
+            "inputs": len(self.files),
+            "to_process": len(active),
+            "skipped": sum(1 for planned in self.files if planned.skipped),
+            "unreadable": sum(1 for planned in self.files if planned.error),
+            "idle": sum(1 for planned in self.files if not planned.outputs),
+            "outputs": sum(len(planned.outputs) for planned in active),
+            "overwrites": sum(len(planned.overwrites) for planned in active),
+            "deletes": sum(1 for planned in active if planned.deletes),
+            "megapixels": round(sum(planned.pixels for planned in active) / 1e6, 2),
+            "estimated_files": self.estimated,
+            "estimated_seconds": round(self.wall_seconds(), 1) if self.estimated else None,
+            "estimated_output_mb": round(self.output_bytes / 2 ** 20, 1) if self.estimated else None,
+            "cost_model": self.model.source if self.model is not None else None,
+        }
+
+
+def plan_job(job, files=None, model=None, workers=1, cancelled=None):
+    plan = JobPlan(job, model, workers)
+    manifest = Manifest.load(job.output_folder) if job.incremental else None
+    journal = RunJournal.load(job, job.resume)
+    for file_name in files if files is not None else iter_files(job):
+        if cancelled is not None and cancelled():
+            break
+        plan.add(plan_input(job, file_name, manifest, journal))
+    return plan
+
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def format_plan(plan):
+    summary = plan.summary()
+    lines = [
+        f"Входных файлов: {summary['inputs']}, к обработке: {summary['to_process']}, "
+        f"без изменений: {summary['skipped']}, не прочитано: {summary['unreadable']}, "
+        f"нечего делать: {summary['idle']}",
+        f"Будет записано файлов: {summary['outputs']} ({summary['megapixels']} Мпикс)",
+        f"Будет перезаписано: {summary['overwrites']}, удалено исходников: {summary['deletes']}",
+    ]
+    if summary["estimated_seconds"] is None:
+        lines.append(f"Оценка времени недоступна: нет результатов замера ({BENCHMARK_NAME})")
+    else:
+        lines.append(f"Оценка: {_format_duration(summary['estimated_seconds'])}, "
+                     f"~{summary['estimated_output_mb']} МБ (по {summary['cost_model']})")
+    return "\n".join(lines)
+
+
+def format_plan_files(plan, limit=MAX_LISTED_FILES):
+    lines = []
+    for planned in plan.files[:limit] if limit else plan.files:
+        if planned.skipped:
+            lines.append(f"{planned.file_name}: без изменений")
+            continue
+        if planned.error:
+            lines.append(f"{planned.file_name}: ошибка чтения заголовка: {planned.error}")
+            continue
+        if not planned.outputs:
+            lines.append(f"{planned.file_name}: нечего делать")
+            continue
+        size = f"{planned.size[0]}x{planned.size[1]}" if planned.size else "?"
+        notes = [f"перезапись {len(planned.overwrites)}"] if planned.overwrites else []
+        if planned.deletes:
+            notes.append("исходник будет удалён")
+        outputs = ", ".join(os.path.relpath(path, plan.job.output_folder) for path in planned.outputs)
+        lines.append(f"{planned.file_name} [{size}] -> {outputs}" + (f" ({', '.join(notes)})" if notes else ""))
+    if limit and len(plan.files) > limit:
+        lines.append(f"... и ещё {len(plan.files) - limit}")
+    return "\n".join(lines)
@@ -0,0 +1,137 @@
+import struct
+import zlib
+import numpy as np
+from atomic_file import AtomicWriter
+from formats import PNG_SIGNATURE
+
+
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+FILTER_NONE = 0
+FILTER_PAETH = 4
+BIT_DEPTHS = {np.dtype(np.uint8): 8, np.dtype(np.uint16): 16}
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def _header_chunk(width, height, channels, bit_depth=8):
+    if channels not in COLOR_TYPES:
+        raise ValueError(f"Неподдерживаемое число каналов PNG: {channels}")
+    return _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, bit_depth, COLOR_TYPES[channels], 0, 0, 0))
+
+
+def encodable(img):
+    return np.asarray(img).dtype in BIT_DEPTHS
+
+
+def _sample_bytes(img):
+    img = np.asarray(img)
+    if img.dtype not in BIT_DEPTHS:
+        raise ValueError(f"Неподдерживаемый тип данных PNG: {img.dtype}")
+    if img.ndim == 2:
+        img = img[:, :, None]
+    if img.dtype == np.uint8:
+        return img
+    height, width, channels = img.shape
+    return img.astype(">u2").view(np.uint8).reshape(height, width, channels * 2)
+
+
+def unfiltered(rows):
+    height, width, channels = rows.shape
+    out = np.empty((height, width * channels + 1), dtype=np.uint8)
+    out[:, 0] = FILTER_NONE
+    out[:, 1:] = rows.reshape(height, -1)
+    return out
+
+
+def paeth_filter(rows, previous):
+    height, width, channels = rows.shape
+    current = rows.astype(np.int16)
+    up = np.empty_like(current)
+    up[0] = previous
+    up[1:] = current[:-1]
+    left = np.zeros_like(current)
+    left[:, 1:] = current[:, :-1]
+    up_left = np.zeros_like(current)
+    up_left[:, 1:] = up[:, :-1]
+    estimate = left + up - up_left
+    dist_left = np.abs(estimate - left)
+    dist_up = np.abs(estimate - up)
+    dist_up_left = np.abs(estimate - up_left)
+    predictor = np.where((dist_left <= dist_up) & (dist_left <= dist_up_left), left,
+                         np.where(dist_up <= dist_up_left, up, up_left))
+    out = np.empty((height, width * channels + 1), dtype=np.uint8)
+    out[:, 0] = FILTER_PAETH
+    out[:, 1:] = ((current - predictor) & 0xFF).reshape(height, -1)
+    return out
+
+
+def encode_png(img, compress_level=6, filtered=True):
+    img = np.asarray(img)
+    bit_depth = BIT_DEPTHS.get(img.dtype)
+    img = _sample_bytes(img)
+    height, width, channels = img.shape
+    header = _header_chunk(width, height, channels * 8 // bit_depth, bit_depth)
+    rows = paeth_filter(img, np.zeros((width, channels), dtype=np.int16)) if filtered else unfiltered(img)
+    return b"".join([PNG_SIGNATURE, header, _chunk(b"IDAT", zlib.compress(rows.tobytes(), compress_level)),
+                     _chunk(b"IEND", b"")])
+
+
+class PngBandWriter:
+    def __init__(self, path, width, height, channels, compress_level=6, filtered=True, sync=False, dtype=np.uint8):
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in BIT_DEPTHS:
+            raise ValueError(f"Неподдерживаемый тип данных PNG: {self.dtype}")
+        header = _header_chunk(width, height, channels, BIT_DEPTHS[self.dtype])
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.filtered = filtered
+        self.rows_written = 0
+        self._previous = np.zeros((width, channels * self.dtype.itemsize), dtype=np.int16)
+        self._compressor = zlib.compressobj(compress_level)
+        self._file = AtomicWriter(path, sync)
+        self._file.write(PNG_SIGNATURE)
+        self._file.write(header)
+
+    def write(self, band):
+        band = np.asarray(band)
+        if band.ndim == 2:
+            band = band[:, :, None]
+        if band.shape[1] != self.width or band.shape[2] != self.channels:
+            raise ValueError("Размер полосы не совпадает с размером изображения")
+        if band.dtype != self.dtype:
+            raise ValueError(f"Тип данных полосы {band.dtype} не совпадает с {self.dtype}")
+        band = _sample_bytes(band)
+        if self.filtered:
+            rows = paeth_filter(band, self._previous)
+            self._previous = band[-1].astype(np.int16)
+        else:
+            rows = unfiltered(band)
+        data = self._compressor.compress(rows.tobytes())
+        if data:
+            self._file.write(_chunk(b"IDAT", data))
+        self.rows_written += band.shape[0]
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Записано строк {self.rows_written} из {self.height}")
+            self._file.write(_chunk(b"IDAT", self._compressor.flush()))
+            self._file.write(_chunk(b"IEND", b""))
+        except BaseException:
+            self._file.discard()
+            raise
+        self._file.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.discard()
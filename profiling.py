@@ -0,0 +1,174 @@
+import os
+import csv
+import json
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+STAGE_DECODE = "decode"
+STAGE_CONVERT = "convert"
+STAGE_ENCODE = "encode"
+STAGE_WRITE = "write"
+STAGES = (STAGE_DECODE, STAGE_CONVERT, STAGE_ENCODE, STAGE_WRITE)
+STAGE_NAMES = {
+    STAGE_DECODE: "Чтение",
+    STAGE_CONVERT: "Конвертация",
+    STAGE_ENCODE: "Сжатие",
+    STAGE_WRITE: "Запись",
+}
+REPORT_NAME = ".texture_report"
+SLOWEST_COUNT = 10
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage, seconds, nbytes=0):
+        entry = self.stages.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += nbytes
+
+    def merge(self, other):
+        for stage, (seconds, nbytes) in other.stages.items():
+            self.add(stage, seconds, nbytes)
+
+    @contextmanager
+    def stage(self, stage, nbytes=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, nbytes)
+
+
+_profiler = None
+
+
+@contextmanager
+def profiled(profile_dir):
+    global _profiler
+    if not profile_dir:
+        yield
+        return
+    import cProfile
+    if _profiler is None or _profiler[0] != profile_dir:
+        _profiler = (profile_dir, cProfile.Profile())
+    profiler = _profiler[1]
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(profile_dir, f"{os.getpid()}.prof"))
+
+
+def merge_profiles(profile_dir, output_path):
+    paths = [entry.path for entry in os.scandir(profile_dir) if entry.name.endswith(".prof")]
+    if not paths:
+        return None
+    import pstats
+    pstats.Stats(*paths).dump_stats(output_path)
+    return output_path
+
+
+def _status(result):
+    if not result.ok:
+        return "error"
+    return "skipped" if result.skipped else "ok"
+
+
+class RunReport:
+    def __init__(self, profile=False, slowest_count=SLOWEST_COUNT):
+        self.created = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.slowest_count = slowest_count
+        self.profile_dir = tempfile.mkdtemp(prefix="texture_profile_") if profile else None
+        self.profile_path = None
+        self.elapsed = 0.0
+        self.failed = self.skipped = 0
+        self.stages = {stage: [0.0, 0] for stage in STAGES}
+        self.rows = []
+        self._start = time.perf_counter()
+
+    def add(self, result):
+        timings = result.timings or {}
+        for stage, (seconds, nbytes) in timings.items():
+            total = self.stages.setdefault(stage, [0.0, 0])
+            total[0] += seconds
+            total[1] += nbytes
+        status = _status(result)
+        self.failed += status == "error"
+        self.skipped += status == "skipped"
+        self.rows.append((result.file_name, status, timings))
+        self.elapsed = time.perf_counter() - self._start
+
+    def summary(self):
+        busy = sum(seconds for seconds, _ in self.stages.values())
+        stages = {}
+        for stage, (seconds, nbytes) in self.stages.items():
+            stages[stage] = {
+                "seconds": round(seconds, 4),
+                "mb": round(nbytes / 2 ** 20, 2),
+                "mb_per_sec": round(nbytes / 2 ** 20 / seconds, 2) if seconds else None,
+                "share": round(seconds / busy, 4) if busy else 0.0,
+            }
+        slowest = sorted((row for row in self.rows if row[2]),
+                         key=lambda row: -sum(seconds for seconds, _ in row[2].values()))[:self.slowest_count]
+        return {
+            "created": self.created,
+            "elapsed": round(self.elapsed, 4),
+            "files": len(self.rows),
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "files_per_sec": round(len(self.rows) / self.elapsed, 2) if self.elapsed else None,
+            "stages": stages,
+            "slowest": [{"file": name,
+                         "seconds": round(sum(seconds for seconds, _ in timings.values()), 4),
+                         "stages": {stage: round(seconds, 4) for stage, (seconds, _) in timings.items()}}
+                        for name, _, timings in slowest],
+            "profile": self.profile_path,
+        }
+
+    def finish_profile(self, output_path):
+        if self.profile_dir is None:
+            return None
+        try:
+            self.profile_path = merge_profiles(self.profile_dir, output_path)
+        finally:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+        return self.profile_path
+
+    def write(self, base_path):
+        self.finish_profile(f"{base_path}.prof")
+        summary = self.summary()
+        with open(f"{base_path}.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        stages = list(STAGES) + sorted(set(self.stages) - set(STAGES))
+        with open(f"{base_path}.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "status", "seconds"] +
+                            [column for stage in stages for column in (f"{stage}_seconds", f"{stage}_bytes")])
+            for name, status, timings in self.rows:
+                row = [name, status, round(sum(seconds for seconds, _ in timings.values()), 6)]
+                for stage in stages:
+                    seconds, nbytes = timings.get(stage, (0.0, 0))
+                    row += [round(seconds, 6), nbytes]
+                writer.writerow(row)
+        return summary
+
+
+def format_summary(summary, slowest=5):
+    lines = [f"Время: {summary['elapsed']:.2f} с, файлов: {summary['files']}"
+             f" ({summary['files_per_sec'] or 0:.2f} файл/с)"]
+    for stage, values in summary["stages"].items():
+        lines.append(f"{STAGE_NAMES.get(stage, stage):<12} {values['seconds']:>9.2f} с {values['share']:>6.0%}"
+                     f" {values['mb_per_sec'] or 0:>9.1f} МБ/с")
+    if summary["slowest"]:
+        lines.append("Самые медленные файлы:")
+        lines += [f"  {entry['file']}: {entry['seconds']:.2f} с" for entry in summary["slowest"][:slowest]]
+    if summary["profile"]:
+        lines.append(f"Профиль cProfile: {summary['profile']}")
+    return "\n".join(lines)
@@ -0,0 +1,146 @@
+import io
+import numpy as np
+import pytest
+import dds
+from formats import MIP_FILTERS, SPACE_LINEAR, SPACE_SRGB, SPACE_NORMAL
+from mipmaps import build_mip_chain
+
+
+SIZES = [(1, 1), (3, 2), (5, 7), (1, 13), (37, 53), (64, 48)]
+TOLERANCE = {dds.FORMAT_BC1: 32, dds.FORMAT_BC3: 32, dds.FORMAT_BC4: 4, dds.FORMAT_BC5: 4, dds.FORMAT_BC7: 32,
+             dds.FORMAT_RGBA: 0}
+CHANNELS = {dds.FORMAT_BC4: [0], dds.FORMAT_BC5: [0, 1]}
+
+
+def texture(height, width, opaque=False):
+    y, x = np.mgrid[0:height, 0:width]
+    img = np.empty((height, width, 4), dtype=np.uint8)
+    for channel in range(4):
+        img[:, :, channel] = 127 + 100 * np.sin(x * 0.11 + channel) * np.cos(y * 0.07 + 2 * channel)
+    if opaque:
+        img[:, :, 3] = 255
+    return img
+
+
+def write(tmp_path, data, name="test.dds"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def assert_close(decoded, img, fmt):
+    channels = CHANNELS.get(fmt, [0, 1, 2, 3])
+    if decoded.ndim == 2:
+        decoded = decoded[:, :, None]
+    error = np.abs(decoded[:, :, :len(channels)].astype(np.int16) - img[:, :, channels])
+    assert error.max() <= TOLERANCE[fmt]
+
+
+@pytest.mark.parametrize("fmt", [dds.FORMAT_BC1, dds.FORMAT_BC3, dds.FORMAT_BC4, dds.FORMAT_BC5, dds.FORMAT_RGBA])
+@pytest.mark.parametrize("size", SIZES)
+def test_encode_read_roundtrip(tmp_path, fmt, size):
+    img = texture(*size, opaque=fmt == dds.FORMAT_BC1)
+    path = write(tmp_path, dds.encode_dds(img, fmt, mipmaps=False))
+    decoded = dds.read_dds(path)
+    assert decoded.shape[:2] == size
+    assert_close(decoded, img, fmt)
+
+
+@pytest.mark.parametrize("fmt", dds.FORMATS)
+@pytest.mark.parametrize("size", SIZES)
+def test_mip_levels(tmp_path, fmt, size):
+    img = texture(*size)
+    path = write(tmp_path, dds.encode_dds(img, fmt))
+    info = dds.read_header(path)
+    assert (info.width, info.height) == (size[1], size[0])
+    assert info.mip_count == max(size).bit_length() == dds.mip_count(size[1], size[0])
+    assert info.level_offset(info.mip_count) == len(open(path, "rb").read())
+    assert info.level_shape(info.mip_count - 1) == (1, 1)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_mip_offsets(tmp_path, size):
+    img = texture(*size)
+    path = write(tmp_path, dds.encode_dds(img, dds.FORMAT_RGBA))
+    for level, expected in enumerate(build_mip_chain(img)):
+        np.testing.assert_array_equal(dds.read_dds(path, mip=level), expected)
+
+
+def test_without_mipmaps(tmp_path):
+    path = write(tmp_path, dds.encode_dds(texture(16, 16), dds.FORMAT_BC3, mipmaps=False))
+    assert dds.read_header(path).mip_count == 1
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        dds.encode_dds(texture(4, 4), "bc9")
+
+
+@pytest.mark.parametrize("fmt", dds.FORMATS)
+@pytest.mark.parametrize("size", SIZES)
+def test_pillow_decodes_output(tmp_path, fmt, size):
+    Image = pytest.importorskip("PIL.Image")
+    img = texture(*size, opaque=fmt == dds.FORMAT_BC1)
+    data = dds.encode_dds(img, fmt)
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded = np.asarray(decoded.convert("RGBA"))
+    assert_close(decoded, img, fmt)
+    if fmt in dds.DECODABLE or fmt == dds.FORMAT_RGBA:
+        ours = dds.read_dds(write(tmp_path, data))
+        ours = ours[:, :, None] if ours.ndim == 2 else ours
+        channels = CHANNELS.get(fmt, [0, 1, 2, 3])
+        np.testing.assert_array_equal(ours[:, :, :len(channels)], decoded[:, :, channels])
+
+
+@pytest.mark.parametrize("fmt", [dds.FORMAT_BC1, dds.FORMAT_BC3, dds.FORMAT_BC5, dds.FORMAT_RGBA])
+def test_read_rows_and_channels(tmp_path, fmt):
+    path = write(tmp_path, dds.encode_dds(texture(37, 53), fmt))
+    full = dds.read_dds(path)
+    np.testing.assert_array_equal(dds.read_dds(path, rows=(8, 20)), full[8:20])
+    np.testing.assert_array_equal(dds.read_dds(path, rows=(36, 37)), full[36:37])
+    np.testing.assert_array_equal(dds.read_dds(path, channels=0), full[:, :, 0])
+    np.testing.assert_array_equal(dds.read_dds(path, channels=[1, 0]), full[:, :, [1, 0]])
+
+
+def test_read_mip_is_clamped(tmp_path):
+    path = write(tmp_path, dds.encode_dds(texture(8, 8), dds.FORMAT_RGBA))
+    assert dds.read_dds(path, mip=10).shape == (1, 1, 4)
+
+
+def test_read_rejects_unsupported(tmp_path):
+    with pytest.raises(dds.UnsupportedFormat):
+        dds.read_dds(write(tmp_path, dds.encode_dds(texture(8, 8), dds.FORMAT_BC7)))
+    with pytest.raises(dds.UnsupportedFormat):
+        dds.read_header(write(tmp_path, b"\x89PNG" + bytes(200), "fake.dds"))
+
+
+@pytest.mark.parametrize("fmt", dds.FORMATS)
+@pytest.mark.parametrize("size", [(1, 1), (5, 7), (37, 53), (64, 48)])
+@pytest.mark.parametrize("band_rows", [4, 12, 256])
+def test_band_writer_matches_encode_dds(tmp_path, fmt, size, band_rows):
+    img = texture(*size)
+    path = tmp_path / "band.dds"
+    with dds.DDSBandWriter(str(path), size[1], size[0], fmt) as writer:
+        for top in range(0, size[0], band_rows):
+            writer.write(img[top:top + band_rows])
+    assert path.read_bytes() == dds.encode_dds(img, fmt)
+
+
+@pytest.mark.parametrize("mip_filter", MIP_FILTERS)
+@pytest.mark.parametrize("space", [SPACE_LINEAR, SPACE_SRGB, SPACE_NORMAL])
+def test_band_writer_mip_filters(tmp_path, mip_filter, space):
+    img = texture(45, 70)
+    path = tmp_path / "band.dds"
+    with dds.DDSBandWriter(str(path), 70, 45, dds.FORMAT_BC3, True, mip_filter, space) as writer:
+        for top in range(0, 45, 8):
+            writer.write(img[top:top + 8])
+    assert path.read_bytes() == dds.encode_dds(img, dds.FORMAT_BC3, True, mip_filter, space)
+
+
+def test_band_writer_incomplete_leaves_nothing(tmp_path):
+    path = tmp_path / "band.dds"
+    writer = dds.DDSBandWriter(str(path), 8, 8)
+    writer.write(texture(4, 8))
+    with pytest.raises(ValueError):
+        writer.close()
+    assert list(tmp_path.iterdir()) == []
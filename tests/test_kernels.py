@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+import kernels
+
+
+def bump(channels, dtype=np.uint8):
+    img = np.random.default_rng(channels).integers(0, 256, (9, 11, channels), dtype=np.uint8)
+    return img.astype(dtype) * 257 if dtype == np.uint16 else img
+
+
+NORMALS = [
+    kernels.bump_to_normal,
+    kernels.reconstruct_normal,
+    kernels.height_to_normal,
+    lambda img: kernels.height_to_normal(img, strength=4.0),
+]
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+@pytest.mark.parametrize("normal", NORMALS)
+def test_normals_scale_with_16_bit_input(channels, normal):
+    expected = normal(bump(channels))
+    result = normal(bump(channels, np.uint16))
+    assert result.dtype == np.uint16
+    np.testing.assert_allclose(result / 65535, expected / 255, atol=1 / 255)
+
+
+@pytest.mark.parametrize("channels", [3, 4])
+@pytest.mark.parametrize("normal", NORMALS[1:])
+def test_normals_are_unit_length(channels, normal):
+    for dtype in (np.uint8, np.uint16):
+        result = normal(bump(channels, dtype)).astype(np.float64) / np.iinfo(dtype).max * 2 - 1
+        np.testing.assert_allclose(np.linalg.norm(result[:, :, :3], axis=2), 1, atol=0.02)
@@ -0,0 +1,26 @@
+import numpy as np
+import imageio.v2 as imageio
+import planner
+from planner import CostModel, format_plan_files, plan_job
+from texture_engine import ConversionJob, MODE_GLOBAL
+
+
+def test_files_without_outputs_are_not_planned(tmp_path, monkeypatch):
+    img = np.zeros((8, 8, 4), dtype=np.uint8)
+    for name in ("wall_bump.png", "wall_bump#.png", "wall.png"):
+        imageio.imwrite(tmp_path / name, img)
+    read = []
+    read_dimensions = planner.read_dimensions
+    monkeypatch.setattr(planner, "read_dimensions", lambda path: read.append(path) or read_dimensions(path))
+    job = ConversionJob(str(tmp_path), file_extension="png", mode=MODE_GLOBAL, convert_bump=False,
+                        delete_originals=True)
+    plan = plan_job(job, model=CostModel({MODE_GLOBAL: [(64, 1.0, 2.0)]}), workers=4)
+    summary = plan.summary()
+    assert [planned.file_name for planned in plan.files if planned.active] == ["wall_bump#.png"]
+    assert read == [str(tmp_path / "wall_bump#.png")]
+    assert summary["inputs"] == 3
+    assert summary["to_process"] == 1
+    assert summary["idle"] == 2
+    assert summary["deletes"] == 1
+    assert (plan.estimated, plan.seconds, plan.output_bytes) == (1, 64.0, 128.0)
+    assert "wall.png: нечего делать" in format_plan_files(plan)
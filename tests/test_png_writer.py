@@ -0,0 +1,94 @@
+import io
+import struct
+import zlib
+import numpy as np
+import pytest
+import imageio.v2 as imageio
+from png_writer import PngBandWriter, encode_png
+
+
+SIZES = [(1, 1), (5, 7), (1, 13), (37, 53)]
+
+
+def texture(height, width, channels, dtype=np.uint8):
+    rng = np.random.default_rng(height * 1000 + width + channels)
+    img = rng.integers(0, np.iinfo(dtype).max + 1, (height, width, channels), dtype=dtype)
+    return img[:, :, 0] if channels == 1 else img
+
+
+def decode(data):
+    return np.asarray(imageio.imread(io.BytesIO(data), format="png"))
+
+
+@pytest.mark.parametrize("channels", [1, 2, 3, 4])
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("filtered", [True, False])
+def test_encode_png_decodes_same(channels, size, filtered):
+    img = texture(*size, channels)
+    np.testing.assert_array_equal(decode(encode_png(img, filtered=filtered)), img)
+
+
+@pytest.mark.parametrize("filtered", [True, False])
+def test_encode_png_keeps_16_bit(filtered):
+    img = texture(37, 53, 1, np.uint16)
+    decoded = decode(encode_png(img, filtered=filtered))
+    assert decoded.dtype == np.uint16
+    np.testing.assert_array_equal(decoded, img)
+
+
+@pytest.mark.parametrize("channels", [2, 3, 4])
+def test_encode_png_16_bit_rows_big_endian(channels):
+    img = texture(5, 7, channels, np.uint16)
+    data = encode_png(img, filtered=False)
+    width, height, bit_depth = struct.unpack(">IIB", data[16:25])
+    assert (width, height, bit_depth) == (7, 5, 16)
+    start = data.index(b"IDAT") + 4
+    rows = np.frombuffer(zlib.decompress(data[start:data.index(b"IEND") - 8]), dtype=np.uint8).reshape(5, -1)
+    assert (rows[:, 0] == 0).all()
+    np.testing.assert_array_equal(rows[:, 1:].copy().view(">u2").reshape(img.shape), img)
+
+
+def test_encode_png_rejects_other_dtypes():
+    with pytest.raises(ValueError):
+        encode_png(np.zeros((4, 4), dtype=np.float32))
+
+
+@pytest.mark.parametrize("compress_level", [1, 6, 9])
+def test_compress_levels(compress_level):
+    img = texture(37, 53, 4)
+    np.testing.assert_array_equal(decode(encode_png(img, compress_level)), img)
+
+
+@pytest.mark.parametrize("channels", [1, 3, 4])
+@pytest.mark.parametrize("filtered", [True, False])
+def test_band_writer_decodes_same(tmp_path, channels, filtered):
+    img = texture(37, 53, channels)
+    path = tmp_path / "band.png"
+    with PngBandWriter(str(path), 53, 37, channels, filtered=filtered) as writer:
+        for top in range(0, 37, 8):
+            writer.write(img[top:top + 8])
+    np.testing.assert_array_equal(decode(path.read_bytes()), img)
+
+
+@pytest.mark.parametrize("filtered", [True, False])
+def test_band_writer_keeps_16_bit(tmp_path, filtered):
+    img = texture(37, 53, 1, np.uint16)
+    path = tmp_path / "band.png"
+    with PngBandWriter(str(path), 53, 37, 1, filtered=filtered, dtype=np.uint16) as writer:
+        for top in range(0, 37, 8):
+            writer.write(img[top:top + 8])
+    np.testing.assert_array_equal(decode(path.read_bytes()), img)
+
+
+def test_band_writer_rejects_wrong_dtype(tmp_path):
+    with pytest.raises(ValueError):
+        with PngBandWriter(str(tmp_path / "band.png"), 8, 8, 1) as writer:
+            writer.write(np.zeros((8, 8), dtype=np.uint16))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_band_writer_rejects_wrong_width(tmp_path):
+    with pytest.raises(ValueError):
+        with PngBandWriter(str(tmp_path / "band.png"), 8, 8, 3) as writer:
+            writer.write(texture(4, 7, 3))
+    assert list(tmp_path.iterdir()) == []
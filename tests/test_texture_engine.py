@@ -0,0 +1,189 @@
+import os
+import numpy as np
+import pytest
+import imageio.v2 as imageio
+import dds
+from formats import PNG_PROFILES
+import texture_engine
+from texture_engine import ConversionJob, process_files, JOURNAL_NAME, MODE_GLOBAL
+
+
+def dxt1_colormap(path, width, height, transparent):
+    cols, rows = (width + 3) // 4, (height + 3) // 4
+    blocks = np.zeros((rows * cols, 4), dtype="<u2")
+    blocks[:, 0], blocks[:, 1] = 0xF800, 0x001F
+    if transparent:
+        blocks[0, 0], blocks[0, 1], blocks[0, 2] = 0x001F, 0xF800, 0x0003
+    with open(path, "wb") as f:
+        f.write(dds._header(width, height, 1, dds.FORMAT_BC1) + blocks.tobytes())
+
+
+def run(source, output, workers=1, **options):
+    job = ConversionJob(str(source), str(output), mode=MODE_GLOBAL, **options)
+    results = list(process_files(job, workers))
+    assert all(result.ok for result in results), [result.error for result in results]
+    return results
+
+
+@pytest.mark.parametrize("size", [(8, 8), (10, 7)])
+@pytest.mark.parametrize("transparent", [True, False])
+def test_tiled_colormap_keeps_bc1_alpha(tmp_path, size, transparent):
+    source = tmp_path / "src"
+    source.mkdir()
+    dxt1_colormap(source / "wall_colormap.dds", *size, transparent)
+    outputs = {}
+    for tiled in (False, True):
+        output = tmp_path / f"out_{tiled}"
+        run(source, output, global_format="dds", tiled=tiled, tile_rows=4)
+        path = str(output / "wall_colormap.dds")
+        outputs[tiled] = (dds.read_header(path).format, dds.read_dds(path)[:, :, 3].min())
+    assert outputs[True] == outputs[False]
+    assert outputs[True] == ((dds.FORMAT_BC3, 0) if transparent else (dds.FORMAT_BC1, 255))
+
+
+@pytest.mark.parametrize("png_profile", PNG_PROFILES)
+@pytest.mark.parametrize("masks_8bit", [False, True])
+def test_16_bit_masks(tmp_path, png_profile, masks_8bit):
+    source = tmp_path / "src"
+    source.mkdir()
+    img = np.random.default_rng(1).integers(0, 65536, (9, 11), dtype=np.uint16)
+    imageio.imwrite(source / "wall_bump#.png", img)
+    run(source, tmp_path / "out", file_extension="png", create_spec=False, png_profile=png_profile,
+        masks_8bit=masks_8bit)
+    roughness = imageio.imread(tmp_path / "out" / "wall_roughness.png")
+    assert roughness.dtype == (np.uint8 if masks_8bit else np.uint16)
+    np.testing.assert_array_equal(roughness, (img >> 8).astype(np.uint8) if masks_8bit else img)
+
+
+def bump_source(tmp_path, seed=0):
+    source = tmp_path / "src"
+    source.mkdir(exist_ok=True)
+    img = np.random.default_rng(seed).integers(0, 256, (8, 8, 4), dtype=np.uint8)
+    imageio.imwrite(source / "wall_bump#.png", img)
+    return source
+
+
+def skipped(results):
+    return [result.skipped for result in results]
+
+
+def test_incremental_skips_from_another_cwd(tmp_path, monkeypatch):
+    bump_source(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    run("src", "out", file_extension="png", incremental=True)
+    monkeypatch.chdir(tmp_path / "src")
+    results = run(tmp_path / "src", tmp_path / "out", file_extension="png", incremental=True)
+    assert skipped(results) == [True]
+    assert all(os.path.isabs(path) and os.path.exists(path) for path in results[0].outputs)
+
+
+def test_incremental_rehashes_touched_source(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    path = source / "wall_colormap.dds"
+    dxt1_colormap(path, 8, 8, False)
+    run(source, tmp_path / "out", incremental=True)
+    mtime = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(mtime, mtime + 10 ** 9))
+    assert skipped(run(source, tmp_path / "out", incremental=True)) == [True]
+    dxt1_colormap(path, 8, 8, True)
+    os.utime(path, ns=(mtime, mtime + 2 * 10 ** 9))
+    assert skipped(run(source, tmp_path / "out", incremental=True)) == [False]
+
+
+def test_incremental_reruns_on_options_change(tmp_path):
+    source = bump_source(tmp_path)
+    run(source, tmp_path / "out", file_extension="png", incremental=True)
+    assert skipped(run(source, tmp_path / "out", file_extension="png", incremental=True)) == [True]
+    results = run(source, tmp_path / "out", file_extension="png", incremental=True, create_spec=False)
+    assert skipped(results) == [False]
+
+
+def test_worker_processes_match_serial_run(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    for index in range(3):
+        dxt1_colormap(source / f"wall{index}_colormap.dds", 8, 8, index % 2)
+    outputs = {}
+    for workers in (1, 2):
+        output = tmp_path / f"out_{workers}"
+        run(source, output, workers, global_format="dds")
+        outputs[workers] = {path.name: path.read_bytes() for path in output.glob("*.dds")}
+    assert len(outputs[2]) == 3
+    assert outputs[2] == outputs[1]
+
+
+def colormaps(tmp_path, count=4):
+    source = tmp_path / "src"
+    source.mkdir()
+    for index in range(count):
+        dxt1_colormap(source / f"wall{index}_colormap.dds", 8, 8, False)
+    return source
+
+
+def interrupt(source, output, done=1, **options):
+    results = process_files(ConversionJob(str(source), str(output), mode=MODE_GLOBAL, **options))
+    finished = [next(results) for _ in range(done)]
+    results.close()
+    assert (output / JOURNAL_NAME).exists()
+    return [result.file_name for result in finished]
+
+
+@pytest.mark.parametrize("io_threads", [0, 2])
+def test_interrupted_run_resumes(tmp_path, io_threads):
+    source = colormaps(tmp_path)
+    output = tmp_path / "out"
+    done = interrupt(source, output, 2, global_format="dds", io_threads=io_threads)
+    results = run(source, output, global_format="dds", io_threads=io_threads)
+    assert sorted(result.file_name for result in results if result.skipped) == sorted(done)
+    assert len(results) == 4
+    assert not (output / JOURNAL_NAME).exists()
+    assert all(result.skipped is False for result in run(source, output, global_format="dds"))
+
+
+@pytest.mark.parametrize("options", [{"global_format": "png"}, {"resume": False}])
+def test_changed_options_rerun_everything(tmp_path, options):
+    source = colormaps(tmp_path)
+    output = tmp_path / "out"
+    interrupt(source, output, 2, global_format="dds")
+    results = run(source, output, **{"global_format": "dds", **options})
+    assert len(results) == 4
+    assert not any(result.skipped for result in results)
+
+
+def test_moved_source_reruns_everything(tmp_path):
+    source = colormaps(tmp_path)
+    output = tmp_path / "out"
+    interrupt(source, output, 2, global_format="dds")
+    moved = tmp_path / "moved"
+    source.rename(moved)
+    assert not any(result.skipped for result in run(moved, output, global_format="dds"))
+
+
+@pytest.mark.parametrize("io_threads", [0, 2])
+@pytest.mark.parametrize("data", [None, b""])
+def test_failed_output_keeps_source(tmp_path, monkeypatch, io_threads, data):
+    source = colormaps(tmp_path, 2)
+
+    def encode_image(job, path, img, kind):
+        if data is None:
+            raise OSError("Диск заполнен")
+        return data
+
+    monkeypatch.setattr(texture_engine, "encode_image", encode_image)
+    job = ConversionJob(str(source), str(tmp_path / "out"), mode=MODE_GLOBAL, delete_originals=True,
+                        io_threads=io_threads)
+    results = list(process_files(job))
+    assert len(results) == 2
+    assert not any(result.ok for result in results)
+    assert sorted(path.name for path in source.iterdir()) == ["wall0_colormap.dds", "wall1_colormap.dds"]
+    assert (tmp_path / "out" / JOURNAL_NAME).exists()
+
+
+@pytest.mark.parametrize("tiled", [False, True])
+def test_png_into_same_folder_keeps_result(tmp_path, tiled):
+    img = np.random.default_rng(2).integers(0, 256, (8, 8, 4), dtype=np.uint8)
+    imageio.imwrite(tmp_path / "wall_colormap.png", img)
+    results = run(tmp_path, tmp_path, file_extension="png", delete_originals=True, tiled=tiled)
+    assert [result.outputs for result in results] == [[str(tmp_path / "wall_colormap.png")]]
+    np.testing.assert_array_equal(imageio.imread(tmp_path / "wall_colormap.png"), img)
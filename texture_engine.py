@@ -0,0 +1,841 @@
+import os
+import io
+import sys
+import argparse
+import copy
+import hashlib
+import json
+from collections import deque
+from contextlib import ExitStack
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from atomic_file import write_atomic
+from formats import (FORMATS, FORMAT_BC1, FORMAT_BC3, FORMAT_BC4, MIP_FILTERS, MIP_BOX, SPACE_LINEAR, SPACE_SRGB,
+                     SPACE_NORMAL, PNG_PROFILES, PNG_FAST, PNG_BALANCED, COMPRESS_LEVELS)
+from profiling import (StageTimer, RunReport, REPORT_NAME, STAGE_DECODE, STAGE_CONVERT, STAGE_ENCODE,
+                       STAGE_WRITE, profiled, format_summary)
+
+
+MODE_GLOBAL = "global"
+MODE_CONVERT = "convert"
+MODE_ALPHA = "alpha"
+MODES = (MODE_GLOBAL, MODE_CONVERT, MODE_ALPHA)
+MANIFEST_NAME = ".texture_manifest.json"
+JOURNAL_NAME = ".texture_journal.jsonl"
+SCAN_CHUNK_SIZE = 256
+TILE_ROWS = 256
+IO_THREADS = 2
+PIPELINE_DEPTH = 4
+
+KIND_COLOR = "color"
+KIND_NORMAL = "normal"
+KIND_MASK = "mask"
+DDS_AUTO = "auto"
+DDS_FORMATS = (DDS_AUTO,) + FORMATS
+NORMAL_SWIZZLE = "swizzle"
+NORMAL_RENORMALIZE = "renormalize"
+NORMAL_HEIGHT = "height"
+NORMAL_MODES = (NORMAL_SWIZZLE, NORMAL_RENORMALIZE, NORMAL_HEIGHT)
+MIP_SPACES = {KIND_COLOR: SPACE_SRGB, KIND_NORMAL: SPACE_NORMAL, KIND_MASK: SPACE_LINEAR}
+STEP_COPY = "copy"
+STEP_NORMAL = "normal"
+STEP_SPEC = "spec"
+STEP_ROUGHNESS = "roughness"
+
+
+class ConversionJob:
+    def __init__(self, source_folder, output_folder=None, file_extension="dds", mode=MODE_GLOBAL, files=None,
+                 pattern_only=True, change_format=True, delete_originals=False, convert_colormap=True,
+                 convert_bump=True, extract_roughness=True, create_spec=True, incremental=False, recursive=False,
+                 global_format="png", dds_format=DDS_AUTO, dds_mipmaps=True, tiled=False, tile_rows=TILE_ROWS,
+                 io_threads=IO_THREADS, png_profile=PNG_BALANCED, normal_mode=NORMAL_SWIZZLE, normal_strength=1.0,
+                 mip_filter=MIP_BOX, profile_dir=None, resume=True, masks_8bit=False):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим: {mode}")
+        self.source_folder = source_folder
+        self.output_folder = output_folder or source_folder
+        self.file_extension = file_extension.lower().lstrip(".")
+        self.mode = mode
+        self.files = list(files) if files else None
+        self.pattern_only = pattern_only
+        self.change_format = change_format
+        self.delete_originals = delete_originals
+        self.convert_colormap = convert_colormap
+        self.convert_bump = convert_bump
+        self.extract_roughness = extract_roughness
+        self.create_spec = create_spec
+        self.incremental = incremental
+        self.recursive = recursive
+        self.global_format = global_format
+        self.dds_format = dds_format
+        self.dds_mipmaps = dds_mipmaps
+        self.tiled = tiled
+        self.tile_rows = max(4, (tile_rows + 3) // 4 * 4)
+        self.io_threads = max(0, io_threads)
+        if png_profile not in PNG_PROFILES:
+            raise ValueError(f"Неизвестный профиль PNG: {png_profile}")
+        self.png_profile = png_profile
+        self.masks_8bit = masks_8bit
+        if normal_mode not in NORMAL_MODES:
+            raise ValueError(f"Неизвестный режим нормалей: {normal_mode}")
+        self.normal_mode = normal_mode
+        self.normal_strength = normal_strength
+        if mip_filter not in MIP_FILTERS:
+            raise ValueError(f"Неизвестный фильтр мип-уровней: {mip_filter}")
+        self.mip_filter = mip_filter
+        self.profile_dir = profile_dir
+        self.resume = resume
+
+    def options(self):
+        return {
+            "mode": self.mode,
+            "file_extension": self.file_extension,
+            "output_folder": os.path.abspath(self.output_folder),
+            "change_format": self.change_format,
+            "convert_colormap": self.convert_colormap,
+            "convert_bump": self.convert_bump,
+            "extract_roughness": self.extract_roughness,
+            "create_spec": self.create_spec,
+            "global_format": self.global_format,
+            "dds_format": self.dds_format,
+            "dds_mipmaps": self.dds_mipmaps,
+            "mip_filter": self.mip_filter,
+            "png_profile": self.png_profile,
+            "masks_8bit": self.masks_8bit,
+            "normal_mode": self.normal_mode,
+            "normal_strength": self.normal_strength,
+        }
+
+    def without_files(self):
+        job = copy.copy(self)
+        job.files = None
+        return job
+
+    def file_suffix(self):
+        if self.mode == MODE_GLOBAL or not self.pattern_only:
+            return f".{self.file_extension}"
+        if self.mode == MODE_CONVERT:
+            return f"_bump.{self.file_extension}"
+        return f"bump#.{self.file_extension}"
+
+    def output_extension(self):
+        if self.mode == MODE_GLOBAL:
+            return f".{self.global_format}"
+        if not self.change_format:
+            return f".{self.file_extension}"
+        return ".png" if self.file_extension == "dds" else ".dds"
+
+
+class FileResult:
+    def __init__(self, file_name, outputs=None, error=None, skipped=False, source=None, timings=None):
+        self.file_name = file_name
+        self.outputs = outputs or []
+        self.error = error
+        self.skipped = skipped
+        self.source = source
+        self.timings = timings
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": file_hash(path)}
+
+
+class Manifest:
+    def __init__(self, path, entries=None):
+        self.path = path
+        self.entries = entries or {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, output_folder):
+        path = os.path.join(output_folder, MANIFEST_NAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            entries = {}
+        return cls(path, entries)
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def current_entry(self, job, file_name, verify_hash=True):
+        input_path = os.path.abspath(os.path.join(job.source_folder, file_name))
+        entry = self.entries.get(input_path)
+        if entry is None or entry["options"] != job.options():
+            return None
+        if not all(os.path.exists(path) for path in entry["outputs"]):
+            return None
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return None
+        source = entry["source"]
+        if stat.st_size != source["size"]:
+            return None
+        if stat.st_mtime_ns != source["mtime"]:
+            if not verify_hash or file_hash(input_path) != source["hash"]:
+                return None
+            source["mtime"] = stat.st_mtime_ns
+            self._dirty = True
+        return entry
+
+    def record(self, job, result):
+        if result.source is None:
+            return
+        input_path = os.path.abspath(os.path.join(job.source_folder, result.file_name))
+        self.entries[input_path] = {"source": result.source, "options": job.options(),
+                                    "outputs": [os.path.abspath(path) for path in result.outputs]}
+        self._dirty = True
+
+
+class RunJournal:
+    def __init__(self, path, header, entries=None):
+        self.path = path
+        self.header = header
+        self.entries = entries or {}
+        self._file = None
+
+    @classmethod
+    def load(cls, job, resume=True):
+        path = os.path.join(job.output_folder, JOURNAL_NAME)
+        header = {"source_folder": os.path.abspath(job.source_folder), "options": job.options()}
+        journal = cls(path, header)
+        if not resume:
+            return journal
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if json.loads(f.readline()) == header:
+                    for line in f:
+                        entry = json.loads(line)
+                        journal.entries[entry["file"]] = entry
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return journal
+
+    def start(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in chain([self.header], self.entries.values()):
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def completed_entry(self, job, file_name):
+        entry = self.entries.get(file_name)
+        if entry is None or not all(os.path.exists(path) for path in entry["outputs"]):
+            return None
+        try:
+            stat = os.stat(os.path.join(self.header["source_folder"], file_name))
+        except OSError:
+            return None
+        if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime"]:
+            return None
+        return entry
+
+    def record(self, job, result):
+        try:
+            stat = os.stat(os.path.join(self.header["source_folder"], result.file_name))
+        except OSError:
+            stat = None
+        entry = {"file": result.file_name, "outputs": [os.path.abspath(path) for path in result.outputs],
+                 "size": stat.st_size if stat else None, "mtime": stat.st_mtime_ns if stat else None}
+        self.entries[result.file_name] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self, finished=False):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if finished:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def scan_files(folder, suffix, recursive=True, chunk_size=SCAN_CHUNK_SIZE, exclude=()):
+    suffix = suffix.lower()
+    exclude = {os.path.abspath(path) for path in exclude}
+    chunk = []
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(folder, rel_dir)) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_file() and entry.name.lower().endswith(suffix):
+                chunk.append(rel_path)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            elif recursive and entry.is_dir(follow_symlinks=False) and os.path.abspath(entry.path) not in exclude:
+                subdirs.append(rel_path)
+        stack.extend(reversed(subdirs))
+    if chunk:
+        yield chunk
+
+
+def scan_job(job, chunk_size=SCAN_CHUNK_SIZE):
+    if not job.source_folder or not os.path.exists(job.source_folder):
+        return iter(())
+    return scan_files(job.source_folder, job.file_suffix(), job.recursive, chunk_size, exclude=[job.output_folder])
+
+
+def iter_files(job):
+    return chain.from_iterable(scan_job(job))
+
+
+def list_files(job):
+    return list(iter_files(job))
+
+
+def convert_bump_to_normal(img, out=None, pool=None, mode=NORMAL_SWIZZLE, strength=1.0):
+    import kernels
+    if mode == NORMAL_RENORMALIZE:
+        return kernels.reconstruct_normal(img, out, pool)
+    if mode == NORMAL_HEIGHT:
+        return kernels.height_to_normal(img, strength, out, pool)
+    return kernels.bump_to_normal(img, out, pool)
+
+
+def extract_alpha(img, out=None, pool=None):
+    import kernels
+    return kernels.alpha_to_roughness(img, out, pool)
+
+
+def extract_spec(img, out=None, pool=None):
+    import kernels
+    return kernels.red_to_spec(img, out, pool)
+
+
+def load_image(path, channels=None, mip=0):
+    import dds
+    if path.lower().endswith(".dds"):
+        try:
+            return dds.read_dds(path, mip=mip, channels=channels)
+        except dds.UnsupportedFormat:
+            pass
+    import imageio.v2 as imageio
+    img = imageio.imread(path)
+    if channels is None:
+        return img
+    if img.ndim == 2:
+        return img
+    return img[:, :, channels]
+
+
+def load_alpha(path):
+    import dds
+    if path.lower().endswith(".dds"):
+        try:
+            info = dds.read_header(path)
+            if info.format in dds.DECODABLE:
+                return dds.read_dds(path, channels=3 if info.channels >= 4 else 0)
+        except dds.UnsupportedFormat:
+            pass
+    import imageio.v2 as imageio
+    return extract_alpha(imageio.imread(path))
+
+
+def _dds_format(job, kind, channels, is_opaque):
+    if job.dds_format != DDS_AUTO:
+        return job.dds_format
+    if kind == KIND_MASK or channels == 1:
+        return FORMAT_BC4
+    if kind == KIND_COLOR and (channels < 4 or is_opaque()):
+        return FORMAT_BC1
+    return FORMAT_BC3
+
+
+def dds_format_for(job, img, kind):
+    channels = 1 if img.ndim == 2 else img.shape[2]
+    return _dds_format(job, kind, channels, lambda: img[:, :, 3].min() == 255)
+
+
+def encode_image(job, path, img, kind):
+    if path.lower().endswith(".dds"):
+        import dds
+        return dds.encode_dds(img, dds_format_for(job, img, kind), job.dds_mipmaps, job.mip_filter, MIP_SPACES[kind])
+    if kind == KIND_MASK and job.masks_8bit:
+        from kernels import to_uint8
+        img = to_uint8(img)
+    import png_writer
+    if job.png_profile == PNG_FAST and png_writer.encodable(img):
+        return png_writer.encode_png(img, COMPRESS_LEVELS[PNG_FAST], filtered=False)
+    import imageio.v2 as imageio
+    buffer = io.BytesIO()
+    imageio.imwrite(buffer, img, format=os.path.splitext(path)[1], compress_level=COMPRESS_LEVELS[job.png_profile])
+    return buffer.getvalue()
+
+
+def _write_file(path, data, timer, sync=False):
+    with timer.stage(STAGE_WRITE, len(data)):
+        write_atomic(path, data, sync)
+    return timer
+
+
+def save_image(job, path, img, kind, timer=None):
+    timer = timer or StageTimer()
+    with timer.stage(STAGE_ENCODE, img.nbytes):
+        data = encode_image(job, path, img, kind)
+    _write_file(path, data, timer)
+
+
+def plan_file(job, file_name):
+    rel_dir, name = os.path.split(file_name)
+    base_name = os.path.splitext(name)[0]
+    output_dir = os.path.join(job.output_folder, rel_dir)
+    lower_name = base_name.lower()
+    ext = job.output_extension()
+    nmap_path = os.path.join(output_dir, f"{base_name.replace('_bump', '_nmap')}{ext}")
+    roughness_path = os.path.join(output_dir, f"{base_name.replace('bump#', 'roughness')}{ext}")
+    if job.mode == MODE_CONVERT:
+        plan = [(nmap_path, KIND_NORMAL, STEP_NORMAL)]
+        if job.create_spec:
+            plan.append((os.path.join(output_dir, f"{base_name}_spec{ext}"), KIND_MASK, STEP_SPEC))
+        return plan
+    if job.mode == MODE_ALPHA:
+        return [(roughness_path, KIND_MASK, STEP_ROUGHNESS)]
+    if "colormap" in lower_name and job.convert_colormap:
+        return [(os.path.join(output_dir, f"{base_name}{ext}"), KIND_COLOR, STEP_COPY)]
+    if "bump#" in lower_name and job.extract_roughness:
+        return [(roughness_path, KIND_MASK, STEP_ROUGHNESS)]
+    if "bump" in lower_name and job.convert_bump:
+        return [(nmap_path, KIND_NORMAL, STEP_NORMAL)]
+    return []
+
+
+_STEPS = {
+    STEP_COPY: lambda job, img, pool: img,
+    STEP_NORMAL: lambda job, img, pool: convert_bump_to_normal(img, pool=pool, mode=job.normal_mode,
+                                                               strength=job.normal_strength),
+    STEP_SPEC: lambda job, img, pool: extract_spec(img, pool=pool),
+    STEP_ROUGHNESS: lambda job, img, pool: extract_alpha(img, pool=pool),
+}
+
+
+def _tileable_header(job, input_path, plan):
+    if not job.tiled or not input_path.lower().endswith(".dds"):
+        return None
+    if job.normal_mode == NORMAL_HEIGHT and any(step == STEP_NORMAL for _, _, step in plan):
+        return None
+    import dds
+    try:
+        info = dds.read_header(input_path)
+    except (OSError, dds.UnsupportedFormat):
+        return None
+    return info if info.format in dds.DECODABLE else None
+
+
+def _output_channels(step, channels):
+    if step in (STEP_SPEC, STEP_ROUGHNESS):
+        return 1
+    return channels
+
+
+def _source_opaque(job, input_path, info):
+    import dds
+    if info.format == FORMAT_BC1:
+        return dds.bc1_opaque(input_path, info)
+    if info.channels < 4:
+        return True
+    return all(dds.read_dds(input_path, channels=3, rows=(top, min(top + job.tile_rows, info.height))).min() == 255
+               for top in range(0, info.height, job.tile_rows))
+
+
+def _band_writer(job, path, input_path, info, kind, channels):
+    if path.lower().endswith(".dds"):
+        import dds
+        fmt = _dds_format(job, kind, channels, lambda: _source_opaque(job, input_path, info))
+        return dds.DDSBandWriter(path, info.width, info.height, fmt, job.dds_mipmaps, job.mip_filter, MIP_SPACES[kind],
+                                 sync=job.delete_originals)
+    from png_writer import PngBandWriter
+    return PngBandWriter(path, info.width, info.height, channels, COMPRESS_LEVELS[job.png_profile],
+                         filtered=job.png_profile != PNG_FAST, sync=job.delete_originals)
+
+
+def _render_tiled(job, input_path, info, plan, timer):
+    import dds
+    import kernels
+    alpha_only = all(step == STEP_ROUGHNESS for _, _, step in plan)
+    if alpha_only:
+        channels = 3 if info.channels >= 4 else 0
+    elif info.channels == 2:
+        channels = [0, 3]
+    else:
+        channels = list(range(info.channels))
+    band_channels = 1 if alpha_only else len(channels)
+    pool = kernels.worker_pool()
+    with ExitStack() as stack:
+        writers = [stack.enter_context(_band_writer(job, output_path, input_path, info, kind,
+                                                     _output_channels(step, band_channels)))
+                   for output_path, kind, step in plan]
+        for top in range(0, info.height, job.tile_rows):
+            with timer.stage(STAGE_DECODE):
+                band = dds.read_dds(input_path, channels=channels, rows=(top, min(top + job.tile_rows, info.height)))
+            for writer, (_, _, step) in zip(writers, plan):
+                with timer.stage(STAGE_CONVERT, band.nbytes):
+                    out = _STEPS[step](job, band, pool)
+                with timer.stage(STAGE_ENCODE, out.nbytes):
+                    writer.write(out)
+
+
+def _load_source(job, input_path, plan, timer):
+    if not plan:
+        return None, None
+    os.makedirs(os.path.dirname(plan[0][0]) or ".", exist_ok=True)
+    timer.add(STAGE_DECODE, 0.0, os.path.getsize(input_path))
+    info = _tileable_header(job, input_path, plan)
+    if info is not None:
+        return info, None
+    with timer.stage(STAGE_DECODE):
+        if all(step == STEP_ROUGHNESS for _, _, step in plan):
+            return None, load_alpha(input_path)
+        return None, load_image(input_path)
+
+
+def _encode_outputs(job, input_path, plan, source, timer):
+    info, img = source
+    if info is not None:
+        _render_tiled(job, input_path, info, plan, timer)
+        return
+    import kernels
+    pool = kernels.worker_pool()
+    for output_path, kind, step in plan:
+        with timer.stage(STAGE_CONVERT, img.nbytes):
+            out = _STEPS[step](job, img, pool)
+        with timer.stage(STAGE_ENCODE, out.nbytes):
+            data = encode_image(job, output_path, out, kind)
+        yield output_path, data
+
+
+def _render_outputs(job, input_path, plan, timer):
+    source = _load_source(job, input_path, plan, timer)
+    for output_path, data in _encode_outputs(job, input_path, plan, source, timer):
+        _write_file(output_path, data, timer, job.delete_originals)
+    return [output_path for output_path, _, _ in plan]
+
+
+def _delete_original(job, input_path, outputs):
+    if not job.delete_originals or job.mode == MODE_CONVERT or not outputs:
+        return
+    input_path = os.path.abspath(input_path)
+    for output_path in outputs:
+        if os.path.abspath(output_path) == input_path:
+            return
+        if not os.path.isfile(output_path) or not os.path.getsize(output_path):
+            raise OSError(f"Результат не записан, исходный файл сохранён: {output_path}")
+    os.remove(input_path)
+
+
+def process_file(job, file_name):
+    input_path = os.path.join(job.source_folder, file_name)
+    timer = StageTimer()
+    try:
+        source = source_signature(input_path) if job.incremental else None
+        outputs = _render_outputs(job, input_path, plan_file(job, file_name), timer)
+        _delete_original(job, input_path, outputs)
+    except Exception as e:
+        return FileResult(file_name, error=str(e), timings=timer.stages)
+    return FileResult(file_name, outputs, source=source, timings=timer.stages)
+
+
+def _read_file(job, file_name):
+    input_path = os.path.join(job.source_folder, file_name)
+    timer = StageTimer()
+    source = source_signature(input_path) if job.incremental else None
+    plan = plan_file(job, file_name)
+    return input_path, plan, source, timer, _load_source(job, input_path, plan, timer)
+
+
+def _encode_file(job, writers, file_name, reading):
+    try:
+        input_path, plan, source, timer, loaded = reading.result()
+        writes = [writers.submit(_write_file, output_path, data, StageTimer(), job.delete_originals)
+                  for output_path, data in _encode_outputs(job, input_path, plan, loaded, timer)]
+    except Exception as e:
+        return FileResult(file_name, error=str(e))
+    return file_name, input_path, [output_path for output_path, _, _ in plan], source, timer, writes
+
+
+def _finish_file(job, pending):
+    if isinstance(pending, FileResult):
+        return pending
+    file_name, input_path, outputs, source, timer, writes = pending
+    try:
+        for write in writes:
+            timer.merge(write.result())
+        _delete_original(job, input_path, outputs)
+    except Exception as e:
+        return FileResult(file_name, error=str(e), timings=timer.stages)
+    return FileResult(file_name, outputs, source=source, timings=timer.stages)
+
+
+def _written(pending):
+    return isinstance(pending, FileResult) or all(write.done() for write in pending[-1])
+
+
+def _pipeline(job, items, depth=PIPELINE_DEPTH):
+    readers = ThreadPoolExecutor(max_workers=job.io_threads)
+    writers = ThreadPoolExecutor(max_workers=job.io_threads)
+    reading = deque()
+    writing = deque()
+
+    def encode_next():
+        item = reading.popleft()
+        if isinstance(item, FileResult):
+            writing.append(item)
+            return
+        with profiled(job.profile_dir):
+            writing.append(_encode_file(job, writers, *item))
+
+    try:
+        for item in items:
+            reading.append(item if isinstance(item, FileResult) else (item, readers.submit(_read_file, job, item)))
+            while len(reading) > depth:
+                encode_next()
+                while writing and (len(writing) > depth or _written(writing[0])):
+                    yield _finish_file(job, writing.popleft())
+        while reading:
+            encode_next()
+        while writing:
+            yield _finish_file(job, writing.popleft())
+    finally:
+        readers.shutdown(wait=True, cancel_futures=True)
+        writers.shutdown(wait=True, cancel_futures=True)
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _process_item(job, item):
+    return item if isinstance(item, FileResult) else process_file(job, item)
+
+
+def _process_batch(job, items):
+    if job.io_threads:
+        return list(_pipeline(job, items))
+    with profiled(job.profile_dir):
+        return [_process_item(job, item) for item in items]
+
+
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _run_items(job, items, workers, batch_size=4):
+    workers = workers or default_workers()
+    if workers <= 1 and job.io_threads:
+        yield from _pipeline(job, items)
+        return
+    if workers <= 1:
+        for item in items:
+            with profiled(job.profile_dir):
+                result = _process_item(job, item)
+            yield result
+        return
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    job = job.without_files()
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = deque()
+    try:
+        for batch in _batched(items, batch_size):
+            if all(isinstance(item, FileResult) for item in batch):
+                pending.append(batch)
+            else:
+                pending.append(executor.submit(_process_batch, job, batch))
+            while len(pending) > workers * 2:
+                item = pending.popleft()
+                yield from item if isinstance(item, list) else item.result()
+        while pending:
+            item = pending.popleft()
+            yield from item if isinstance(item, list) else item.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _skip_unchanged(job, files, manifest, journal):
+    for file_name in files:
+        entry = journal.completed_entry(job, file_name) if journal is not None else None
+        if entry is None and manifest is not None:
+            entry = manifest.current_entry(job, file_name)
+        yield file_name if entry is None else FileResult(file_name, entry["outputs"], skipped=True)
+
+
+def process_files(job, workers=1, files=None):
+    if files is None:
+        files = job.files if job.files is not None else iter_files(job)
+    if isinstance(files, list):
+        workers = min(workers or default_workers(), len(files))
+    manifest = Manifest.load(job.output_folder) if job.incremental else None
+    journal = RunJournal.load(job, job.resume)
+    if manifest is not None or journal.entries:
+        files = _skip_unchanged(job, files, manifest, journal)
+    os.makedirs(job.output_folder, exist_ok=True)
+    journal.start()
+    results = _run_items(job, files, workers)
+    finished = failed = False
+    try:
+        for result in results:
+            if result.ok and not result.skipped:
+                journal.record(job, result)
+                if manifest is not None:
+                    manifest.record(job, result)
+            failed = failed or not result.ok
+            yield result
+        finished = True
+    finally:
+        results.close()
+        if manifest is not None:
+            manifest.save()
+        journal.close(finished and not failed)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="converter.py",
+        description="Пакетная конвертация текстур S.T.A.L.K.E.R. без графического интерфейса")
+    parser.add_argument("source", help="Исходная папка")
+    parser.add_argument("-o", "--output", help="Папка назначения (по умолчанию исходная)")
+    parser.add_argument("-e", "--ext", choices=("dds", "png"), default="dds", help="Расширение исходных файлов")
+    parser.add_argument("-m", "--mode", choices=MODES, default=MODE_GLOBAL,
+                        help="global - глобальная обработка, convert - bump в normal, alpha - извлечение roughness")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Обрабатывать также вложенные папки")
+    parser.add_argument("--all-files", action="store_true",
+                        help="Обрабатывать все файлы, а не только *_bump / *bump#")
+    parser.add_argument("--keep-format", action="store_true",
+                        help="Не менять формат в режимах convert и alpha")
+    parser.add_argument("--delete-originals", action="store_true",
+                        help="Удалять исходные файлы (режимы global и alpha)")
+    parser.add_argument("--no-colormap", action="store_true", help="Не конвертировать *_colormap")
+    parser.add_argument("--no-bump", action="store_true", help="Не конвертировать *_bump")
+    parser.add_argument("--no-roughness", action="store_true", help="Не извлекать roughness из *bump#")
+    parser.add_argument("--no-spec", action="store_true", help="Не создавать specular карты")
+    parser.add_argument("--global-format", choices=("png", "dds"), default="png",
+                        help="Формат результатов глобальной обработки")
+    parser.add_argument("--dds-format", choices=DDS_FORMATS, default=DDS_AUTO,
+                        help="Сжатие DDS: auto - BC1/BC3 для colormap, BC3 для normal, BC4 для масок")
+    parser.add_argument("--png-profile", choices=PNG_PROFILES, default=PNG_BALANCED,
+                        help="Сжатие PNG: fast - быстро и крупно, balanced - по умолчанию, archive - максимальное сжатие")
+    parser.add_argument("--8bit-masks", dest="masks_8bit", action="store_true",
+                        help="Сохранять маски roughness и spec в PNG как 8-битные оттенки серого")
+    parser.add_argument("--normal-mode", choices=NORMAL_MODES, default=NORMAL_SWIZZLE,
+                        help="swizzle - только перестановка каналов, renormalize - восстановить Z и нормализовать, "
+                             "height - построить нормали из карты высот (Собель)")
+    parser.add_argument("--normal-strength", type=float, default=1.0, help="Сила рельефа для --normal-mode height")
+    parser.add_argument("--no-mipmaps", action="store_true", help="Не создавать мип-уровни в DDS")
+    parser.add_argument("--mip-filter", choices=MIP_FILTERS, default=MIP_BOX,
+                        help="Фильтр мип-уровней: box - быстрый, kaiser - более резкий")
+    parser.add_argument("--tiled", action="store_true",
+                        help="Обрабатывать DDS полосами строк, не загружая текстуру целиком")
+    parser.add_argument("--tile-rows", type=int, default=TILE_ROWS, help="Высота полосы в строках для --tiled")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Число параллельных процессов (0 - по числу ядер)")
+    parser.add_argument("--io-threads", type=int, default=IO_THREADS,
+                        help="Потоков чтения и записи на процесс (0 - читать, сжимать и записывать последовательно)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Не продолжать прерванный запуск, а обработать все файлы заново")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="Пропускать файлы, не изменившиеся с прошлого запуска")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Только показать план: выходные файлы, перезаписи, удаления и оценку времени")
+    parser.add_argument("--benchmark", help="JSON замера benchmark.py для оценки времени в --dry-run")
+    parser.add_argument("--report",
+                        help="Путь к отчёту о времени этапов без расширения (по умолчанию .texture_report в папке назначения)")
+    parser.add_argument("--profile", action="store_true", help="Дополнительно собрать профиль cProfile (.prof)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Выводить каждый обработанный файл")
+    return parser
+
+
+def job_from_args(args):
+    return ConversionJob(
+        args.source, args.output, file_extension=args.ext, mode=args.mode,
+        pattern_only=not args.all_files, change_format=not args.keep_format,
+        delete_originals=args.delete_originals, convert_colormap=not args.no_colormap,
+        convert_bump=not args.no_bump, extract_roughness=not args.no_roughness,
+        create_spec=not args.no_spec, incremental=args.incremental, recursive=args.recursive,
+        global_format=args.global_format, dds_format=args.dds_format, dds_mipmaps=not args.no_mipmaps,
+        tiled=args.tiled, tile_rows=args.tile_rows, io_threads=args.io_threads,
+        png_profile=args.png_profile, masks_8bit=args.masks_8bit, normal_mode=args.normal_mode, normal_strength=args.normal_strength,
+        mip_filter=args.mip_filter, resume=not args.no_resume)
+
+
+def dry_run(job, args):
+    from planner import CostModel, find_benchmark, plan_job, format_plan, format_plan_files
+    benchmark_path = args.benchmark or find_benchmark()
+    model = CostModel.load(benchmark_path) if benchmark_path else None
+    plan = plan_job(job, model=model, workers=args.jobs or default_workers())
+    if args.verbose:
+        print(format_plan_files(plan, limit=None))
+    print(format_plan(plan))
+    return 0
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if not os.path.isdir(args.source):
+        print(f"Ошибка: укажите корректную исходную папку ({args.source})", file=sys.stderr)
+        return 2
+    job = job_from_args(args)
+    if args.dry_run:
+        return dry_run(job, args)
+    os.makedirs(job.output_folder, exist_ok=True)
+    report = RunReport(profile=args.profile)
+    job.profile_dir = report.profile_dir
+    total = failed = skipped = 0
+    for total, result in enumerate(process_files(job, args.jobs), 1):
+        report.add(result)
+        if not result.ok:
+            failed += 1
+            print(f"Ошибка обработки {result.file_name}: {result.error}", file=sys.stderr)
+        elif result.skipped:
+            skipped += 1
+        elif args.verbose:
+            print(f"[{total}] {result.file_name}")
+    print(f"Обработано файлов: {total - failed} из {total}, без изменений пропущено: {skipped}")
+    report_path = args.report or os.path.join(job.output_folder, REPORT_NAME)
+    summary = report.write(report_path)
+    if args.verbose or args.profile:
+        print(format_summary(summary))
+    print(f"Отчёт о времени этапов: {report_path}.json")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
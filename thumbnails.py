@@ -0,0 +1,125 @@
+import os
+import io
+import hashlib
+import threading
+from texture_engine import convert_bump_to_normal, NORMAL_SWIZZLE
+
+
+THUMBNAIL_SIZE = 96
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+VARIANT_SOURCE = "source"
+VARIANT_NORMAL = "normal"
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "stalker_texture_converter", "thumbnails")
+
+
+def _fit(img, size):
+    import numpy as np
+    step = max(1, max(img.shape[:2]) // size)
+    return np.ascontiguousarray(img[::step, ::step])
+
+
+def _load_preview(path, size):
+    import numpy as np
+    import dds
+    if path.lower().endswith(".dds"):
+        try:
+            info = dds.read_header(path)
+            if info.format in dds.DECODABLE:
+                mip = 0
+                while mip + 1 < info.mip_count and min(info.level_shape(mip + 1)) >= size:
+                    mip += 1
+                return dds.read_dds(path, mip=mip), info.width
+        except dds.UnsupportedFormat:
+            pass
+    import imageio.v2 as imageio
+    img = np.asarray(imageio.imread(path))
+    return img, img.shape[1]
+
+
+def make_thumbnail(path, size=THUMBNAIL_SIZE, variant=VARIANT_SOURCE, normal_mode=NORMAL_SWIZZLE,
+                   normal_strength=1.0):
+    import imageio.v2 as imageio
+    import dds
+    img, width = _load_preview(path, size)
+    img = _fit(img, size)
+    if variant == VARIANT_NORMAL and img.ndim == 3 and img.shape[2] in (3, 4):
+        img = convert_bump_to_normal(img, mode=normal_mode, strength=normal_strength * img.shape[1] / width)
+    img = dds.to_rgba8(img)
+    buffer = io.BytesIO()
+    imageio.imwrite(buffer, img, format="png")
+    return buffer.getvalue()
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir=None, max_bytes=CACHE_MAX_BYTES, size=THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                self._entries[entry.path] = (stat.st_mtime, stat.st_size)
+        self._bytes = sum(size for _, size in self._entries.values())
+
+    def _key_path(self, path, variant, normal_mode, normal_strength):
+        stat = os.stat(path)
+        if variant == VARIANT_NORMAL:
+            variant = f"{variant}|{normal_mode}|{normal_strength}"
+        key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{variant}|{self.size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def get(self, path, variant=VARIANT_SOURCE, normal_mode=NORMAL_SWIZZLE, normal_strength=1.0):
+        cache_path = self._key_path(path, variant, normal_mode, normal_strength)
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = make_thumbnail(path, self.size, variant, normal_mode, normal_strength)
+            self._store(cache_path, data)
+            return data
+        self._touch(cache_path, len(data))
+        return data
+
+    def _touch(self, cache_path, size):
+        try:
+            os.utime(cache_path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries[cache_path] = (os.path.getmtime(cache_path), size)
+
+    def _store(self, cache_path, data):
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cache_path)
+        with self._lock:
+            old = self._entries.get(cache_path)
+            self._bytes += len(data) - (old[1] if old else 0)
+            self._entries[cache_path] = (os.path.getmtime(cache_path), len(data))
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        for cache_path, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if self._bytes <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            del self._entries[cache_path]
+            self._bytes -= size
+
+    @property
+    def nbytes(self):
+        return self._bytes